@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from avg_calc.models import DailyActivityCount
+
+
+def get_window_days():
+    return getattr(settings, "ACTIVE_USERS_WINDOW_DAYS", 7)
+
+
+def count_activity(user_id, day, delta=1):
+    """
+    Adds ``delta`` to a user's activity count for one day.
+
+    Increments use a single ``INSERT ... ON CONFLICT`` statement so concurrent
+    writers never race on creating the row. Decrements only touch an existing
+    row, which keeps them safe while the user itself is being deleted.
+    """
+    if delta < 0:
+        DailyActivityCount.objects.filter(user_id=user_id, date=day).update(
+            count=Greatest(F("count") + delta, 0)
+        )
+        return
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(DailyActivityCount._meta.db_table)} AS counter "
+            f"({quote('user_id')}, {quote('date')}, {quote('count')}) "
+            f"VALUES (%s, %s, %s) "
+            f"ON CONFLICT ({quote('user_id')}, {quote('date')}) DO UPDATE SET "
+            f"{quote('count')} = counter.{quote('count')} + EXCLUDED.{quote('count')}",
+            [user_id, day, delta],
+        )
+
+
+def top_active_users(limit=3, days=None):
+    """
+    Returns the users with the most activity over the last ``days`` days,
+    including today, summed from the daily counters. The window is read
+    through the counters' date index, so it is not cached and every process
+    sees new activity at once.
+
+    Returns:
+        list: Dicts with ``username``, ``activity_count`` and
+        ``activity_description``.
+    """
+    days = days or get_window_days()
+    since = timezone.localdate() - timedelta(days=days - 1)
+    description = (
+        "Most active this week" if days == 7 else f"Most active in the last {days} days"
+    )
+    return [
+        {**row, "activity_description": description}
+        for row in DailyActivityCount.objects.filter(date__gte=since)
+        .values("user_id", username=F("user__username"))
+        .annotate(activity_count=Sum("count"))
+        .order_by("-activity_count", "username")[:limit]
+    ]
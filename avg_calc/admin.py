@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import SalaryExpenses, WorkTimeEntry
+from .models import Holiday, SalaryExpenses, WorkTimeEntry
 
 admin.site.register(WorkTimeEntry)
 admin.site.register(SalaryExpenses)
+admin.site.register(Holiday)
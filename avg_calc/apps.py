@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AvgCalcConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "avg_calc"
+
+    def ready(self):
+        from avg_calc import signals  # noqa: F401
@@ -0,0 +1,107 @@
+import random
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from avg_calc.models import Leave, OrgCounter, SalaryExpenses, Task, WorkTimeEntry
+
+# Counter name -> (model, summed field or None for a row count)
+COUNTERS = {
+    "users": (User, None),
+    "worklogs": (WorkTimeEntry, None),
+    "expenses": (SalaryExpenses, "salary"),
+    "tasks": (Task, None),
+    "leaves": (Leave, None),
+}
+BASE_SHARD = 0
+
+
+def get_shard_count(shards=None):
+    return shards or getattr(settings, "ORG_COUNTER_SHARDS", 16)
+
+
+def compute_counter(name):
+    model, field = COUNTERS[name]
+    if field is None:
+        return Decimal(model.objects.aggregate(value=Count("pk"))["value"])
+    return model.objects.aggregate(value=Sum(field))["value"] or Decimal(0)
+
+
+def _as_number(name, value):
+    return value if COUNTERS[name][1] else int(value)
+
+
+def get_counters():
+    """
+    Returns the organization-wide totals shown on the admin dashboard.
+
+    Every counter is the sum of its base row and its delta shards, read with
+    one query, so every process sees a write as soon as it commits. A counter
+    without a base row is computed once with a full scan and stored.
+
+    Returns:
+        dict: Counter values keyed by name.
+    """
+    stored, based = {}, set()
+    for name, shard, value in OrgCounter.objects.values_list("name", "shard", "value"):
+        stored[name] = stored.get(name, 0) + value
+        if shard == BASE_SHARD:
+            based.add(name)
+    if COUNTERS.keys() - based:
+        reconcile_counters(COUNTERS.keys() - based)
+        return get_counters()
+
+    return {name: _as_number(name, stored[name]) for name in COUNTERS}
+
+
+def adjust_counter(name, delta):
+    """
+    Adds ``delta`` to a random delta shard of a counter in the current
+    transaction. Concurrent writers, and a bulk import holding its shard
+    until it commits, rarely wait on each other's row lock.
+    """
+    if not delta:
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(OrgCounter._meta.db_table)} AS counter "
+            f"({quote('name')}, {quote('shard')}, {quote('value')}, "
+            f"{quote('updated_at')}) VALUES (%s, %s, %s, now()) "
+            f"ON CONFLICT ({quote('name')}, {quote('shard')}) DO UPDATE SET "
+            f"{quote('value')} = counter.{quote('value')} + EXCLUDED.{quote('value')}, "
+            f"{quote('updated_at')} = EXCLUDED.{quote('updated_at')}",
+            [name, random.randint(1, get_shard_count()), delta],
+        )
+
+
+def reconcile_counters(names=tuple(COUNTERS)):
+    """
+    Recomputes counters from their tables, stores the exact values in their
+    base rows and folds the delta shards away. Run periodically, this bounds
+    any drift and the number of rows a read sums.
+
+    Returns:
+        dict: The drift corrected for each counter, keyed by name.
+    """
+    drift = {}
+    with transaction.atomic():
+        stored = {}
+        for name, value in (
+            OrgCounter.objects.select_for_update()
+            .filter(name__in=names)
+            .order_by("name", "shard")
+            .values_list("name", "value")
+        ):
+            stored[name] = stored.get(name, 0) + value
+        for name in sorted(names):
+            value = compute_counter(name)
+            drift[name] = _as_number(name, value - stored.get(name, 0))
+            OrgCounter.objects.filter(name=name).exclude(shard=BASE_SHARD).delete()
+            OrgCounter.objects.update_or_create(
+                name=name, shard=BASE_SHARD, defaults={"value": value}
+            )
+    return drift
@@ -0,0 +1,48 @@
+from django.conf import settings
+
+from avg_calc.versions import bump_versions, get_versions
+
+VERSION_KEY = "dashboard:{user_id}:{year}:{month}"
+GLOBAL_VERSION_KEY = "dashboard"
+DASHBOARD_KEY = "avg_calc:dashboard:{user_id}:{year}:{month}:{version}:{global_version}"
+
+
+def get_dashboard_cache_timeout():
+    return getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 3600)
+
+
+def dashboard_cache_key(user_id, year, month):
+    """
+    Returns the cache key of a user's dashboard for one month. The key embeds
+    the month's version and the global version, read from the database with
+    one query, so bumping either one in any process makes every earlier render
+    unreachable in all of them.
+    """
+    keys = [VERSION_KEY.format(user_id=user_id, year=year, month=month)]
+    keys.append(GLOBAL_VERSION_KEY)
+    versions = get_versions(keys)
+    return DASHBOARD_KEY.format(
+        user_id=user_id,
+        year=year,
+        month=month,
+        version=versions[keys[0]],
+        global_version=versions[GLOBAL_VERSION_KEY],
+    )
+
+
+def bump_dashboard_versions(keys):
+    """
+    Invalidates the cached dashboards of the given ``(user_id, year, month)``
+    keys, together with the current transaction.
+    """
+    bump_versions(
+        VERSION_KEY.format(user_id=user_id, year=year, month=month)
+        for user_id, year, month in keys
+    )
+
+
+def bump_all_dashboards():
+    """
+    Invalidates every cached dashboard, e.g. after a company holiday changed.
+    """
+    bump_versions([GLOBAL_VERSION_KEY])
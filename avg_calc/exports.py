@@ -0,0 +1,134 @@
+import csv
+import tempfile
+
+from django.conf import settings
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from avg_calc.imports import DATE_FORMAT, TIME_FORMAT, TIMELOG_COLUMNS, USERNAME_COLUMN
+from avg_calc.models import WorkTimeEntry
+
+# Same layout as an organization import, so exports can be uploaded again
+EXPORT_COLUMNS = [USERNAME_COLUMN, *TIMELOG_COLUMNS, "Total Work Time"]
+EXPORT_FIELDS = [
+    "user__username",
+    "date",
+    "login_time",
+    "logout_time",
+    "breakout_time",
+    "breakin_time",
+    "total_work_time",
+]
+# A worksheet holds 1,048,576 rows, one of which is the header
+XLSX_MAX_ROWS = 1048575
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Cell formats per EXPORT_FIELDS entry, matching DATE_FORMAT and TIME_FORMAT
+XLSX_NUMBER_FORMATS = [
+    None,
+    "dd-mm-yyyy",
+    "hh:mm:ss",
+    "hh:mm:ss",
+    "hh:mm:ss",
+    "hh:mm:ss",
+    "[h]:mm:ss",
+]
+# Workbooks up to this size stay in memory before spilling to disk
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def get_export_chunk_size(chunk_size=None):
+    return chunk_size or getattr(settings, "TIMELOG_EXPORT_CHUNK_SIZE", 2000)
+
+
+def export_queryset(start_date, end_date, user=None):
+    entries = WorkTimeEntry.objects.filter(date__range=(start_date, end_date))
+    if user is not None:
+        entries = entries.filter(user=user)
+    return entries.order_by("date", "user__username").values_list(*EXPORT_FIELDS)
+
+
+def _format_row(row):
+    username, day, *times, total = row
+    return [
+        username,
+        day.strftime(DATE_FORMAT),
+        *(value.strftime(TIME_FORMAT) if value else "" for value in times),
+        str(total) if total is not None else "",
+    ]
+
+
+def iter_export_rows(entries, chunk_size=None):
+    """
+    Yields formatted export rows, fetching entries from a server-side cursor
+    ``chunk_size`` at a time so memory does not grow with the export.
+    """
+    for row in entries.iterator(chunk_size=get_export_chunk_size(chunk_size)):
+        yield _format_row(row)
+
+
+class Echo:
+    """
+    A file-like object whose ``write`` returns the line instead of buffering
+    it, so ``csv.writer`` can feed a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(entries, chunk_size=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in iter_export_rows(entries, chunk_size):
+        yield writer.writerow(row)
+
+
+def _typed_cell(sheet, value, number_format):
+    if value is None or number_format is None:
+        return value
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.number_format = number_format
+    return cell
+
+
+def write_xlsx(entries, chunk_size=None, rows_per_sheet=XLSX_MAX_ROWS):
+    """
+    Writes the export with openpyxl's write-only workbook, which streams rows
+    to disk instead of keeping the sheets in memory. Dates, times and totals
+    are typed cells shown in the import formats, and an export longer than
+    ``rows_per_sheet`` rows continues on a new sheet.
+
+    Returns:
+        file: A spooled temporary file holding the workbook, rewound to the
+        start and deleted once closed.
+    """
+    workbook = Workbook(write_only=True)
+    rows = entries.iterator(chunk_size=get_export_chunk_size(chunk_size))
+    row = next(rows, None)
+    while row is not None or not workbook.worksheets:
+        sheet_number = len(workbook.worksheets) + 1
+        sheet = workbook.create_sheet(
+            "Time Logs" if sheet_number == 1 else f"Time Logs {sheet_number}"
+        )
+        header = []
+        for column in EXPORT_COLUMNS:
+            cell = WriteOnlyCell(sheet, value=column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+        for _ in range(rows_per_sheet):
+            if row is None:
+                break
+            sheet.append(
+                [
+                    _typed_cell(sheet, value, number_format)
+                    for value, number_format in zip(row, XLSX_NUMBER_FORMATS)
+                ]
+            )
+            row = next(rows, None)
+
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE, suffix=".xlsx")
+    workbook.save(output)
+    output.seek(0)
+    return output
@@ -1,11 +1,22 @@
 import calendar
-from datetime import datetime
+from datetime import date, datetime
+from zipfile import BadZipFile
 
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.core.validators import FileExtensionValidator
+from openpyxl.utils.exceptions import InvalidFileException
 
-from .models import DailyWorkSummary, Leave, SalaryExpenses, Task, WorkTimeEntry
+from .imports import missing_columns, read_header
+from .models import (
+    DailyWorkSummary,
+    Leave,
+    SalaryExpenses,
+    Task,
+    TimelogImport,
+    WorkTimeEntry,
+)
 
 
 class RegisterForm(UserCreationForm):
@@ -46,9 +57,59 @@ class WorkTimeEntryForm(forms.ModelForm):
         for visible in self.visible_fields():
             visible.field.widget.attrs["class"] = "form-control"
 
+    def clean_date(self):
+        date = self.cleaned_data["date"]
+        if (
+            self.instance.user_id
+            and WorkTimeEntry.objects.filter(user_id=self.instance.user_id, date=date)
+            .exclude(pk=self.instance.pk)
+            .exists()
+        ):
+            raise forms.ValidationError("A timelog for this date already exists.")
+        return date
+
 
 class UploadExcelForm(forms.Form):
-    excel_file = forms.FileField(label="Upload Excel File")
+    excel_file = forms.FileField(
+        label="Upload Excel or CSV File",
+        validators=[FileExtensionValidator(["xlsx", "csv", "tsv", "txt"])],
+    )
+    mode = forms.ChoiceField(
+        choices=TimelogImport.MODE_CHOICES,
+        initial="upsert",
+        required=False,
+        label="Existing Days",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for visible in self.visible_fields():
+            visible.field.widget.attrs["class"] = "form-control"
+
+    def clean_excel_file(self):
+        excel_file = self.cleaned_data["excel_file"]
+        try:
+            columns = read_header(excel_file)
+        except (BadZipFile, InvalidFileException):
+            raise forms.ValidationError("The file is not a readable workbook.")
+        missing = missing_columns(columns)
+        if missing:
+            raise forms.ValidationError(f"Missing columns: {', '.join(missing)}.")
+        return excel_file
+
+
+class OrgUploadForm(forms.Form):
+    upload_file = forms.FileField(
+        label="Upload Workbook, CSV or Zip",
+        help_text="Use a Username column, one sheet per user or one file per user.",
+        validators=[FileExtensionValidator(["xlsx", "csv", "tsv", "txt", "zip"])],
+    )
+    mode = forms.ChoiceField(
+        choices=TimelogImport.MODE_CHOICES,
+        initial="upsert",
+        required=False,
+        label="Existing Days",
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -56,6 +117,13 @@ class UploadExcelForm(forms.Form):
             visible.field.widget.attrs["class"] = "form-control"
 
 
+def user_choices():
+    # Evaluated lazily, only when the field is rendered or validated.
+    return [("", "All Users")] + list(
+        User.objects.filter(is_staff=False).values_list("id", "username")
+    )
+
+
 class MonthChoiceForm(forms.Form):
     month = forms.ChoiceField(
         choices=[(str(i), calendar.month_name[i]) for i in range(1, 13)],
@@ -67,8 +135,7 @@ class MonthChoiceForm(forms.Form):
         label="Select Year",
     )
     user = forms.ChoiceField(
-        choices=[("", "All Users")]
-        + [(user.id, user.username) for user in User.objects.filter(is_staff=False)],
+        choices=user_choices,
         required=False,
         label="Select User",
     )
@@ -80,14 +147,36 @@ class MonthChoiceForm(forms.Form):
         self.fields["month"].initial = str(current_date.month)
         self.fields["year"].initial = current_date.year
 
-        self.fields["user"].choices = [("", "All Users")] + [
-            (user.id, user.username) for user in User.objects.filter(is_staff=False)
-        ]
         self.fields["year"].choices = [
             (year, year) for year in range(2020, datetime.now().year + 1)
         ]
 
 
+class TimelogExportForm(forms.Form):
+    FORMAT_CHOICES = [("csv", "CSV"), ("xlsx", "Excel")]
+
+    start_date = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    end_date = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    user = forms.ChoiceField(choices=user_choices, required=False, label="User")
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        today = date.today()
+        start_date = cleaned_data.get("start_date") or today.replace(day=1)
+        end_date = cleaned_data.get("end_date") or today
+        if end_date < start_date:
+            self.add_error("end_date", "End date must not be before start date.")
+        cleaned_data["start_date"] = start_date
+        cleaned_data["end_date"] = end_date
+        cleaned_data["format"] = cleaned_data.get("format") or "csv"
+        return cleaned_data
+
+
 class DailyWorkSummaryForm(forms.ModelForm):
     class Meta:
         model = DailyWorkSummary
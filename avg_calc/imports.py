@@ -0,0 +1,771 @@
+import csv
+import hashlib
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from datetime import time as dt_time
+from datetime import timedelta
+from itertools import islice
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Func, JSONField, Q, Value
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from avg_calc.methods import log_activity
+from avg_calc.models import TimelogImport, WorkTimeEntry
+from avg_calc.signals import timelogs_imported
+
+TIMELOG_COLUMNS = [
+    "Date",
+    "Login Time",
+    "Logout Time",
+    "Break-Out Time",
+    "Break-In Time",
+]
+TIME_COLUMNS = {
+    "login_time": "Login Time",
+    "logout_time": "Logout Time",
+    "breakout_time": "Break-Out Time",
+    "breakin_time": "Break-In Time",
+}
+DATE_FORMAT = "%d-%m-%Y"
+TIME_FORMAT = "%H:%M:%S"
+USERNAME_COLUMN = "Username"
+DRY_RUN_CHANGE_LIMIT = 500
+STATUS_PREVIEW_SIZE = 50
+DELIMITED_EXTENSIONS = {".csv": ",", ".tsv": "\t", ".txt": None}
+# Job fields a chunk advances in the transaction that writes its rows
+COMMITTED_FIELDS = [
+    "rows_committed",
+    "rows_imported",
+    "rows_updated",
+    "rows_unchanged",
+    "rows_failed",
+    "errors",
+    "changes",
+]
+ENTRY_FIELDS = [
+    "login_time",
+    "logout_time",
+    "breakout_time",
+    "breakin_time",
+    "total_work_time",
+]
+# Bind parameters PostgreSQL accepts in one statement
+MAX_QUERY_PARAMS = 65535
+
+
+@dataclass
+class ImportResult:
+    rows: int
+    seconds: float
+    resumed_from: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    job_id: int = None
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+
+def get_batch_size(batch_size=None):
+    batch_size = batch_size or getattr(settings, "TIMELOG_IMPORT_BATCH_SIZE", 1000)
+    # A row binds its user, date and every ENTRY_FIELDS value
+    return min(batch_size, MAX_QUERY_PARAMS // (2 + len(ENTRY_FIELDS)))
+
+
+def get_chunk_size(chunk_size=None):
+    return chunk_size or getattr(settings, "TIMELOG_IMPORT_CHUNK_SIZE", 5000)
+
+
+def get_error_limit(limit=None):
+    return limit or getattr(settings, "TIMELOG_IMPORT_ERROR_LIMIT", 1000)
+
+
+def get_stale_after(seconds=None):
+    return seconds or getattr(settings, "TIMELOG_IMPORT_STALE_AFTER", 900)
+
+
+def stale_before():
+    """
+    Returns:
+        datetime: Running jobs whose ``updated_at`` heartbeat is older than
+        this belong to a worker that died and may be claimed again.
+    """
+    return timezone.now() - timedelta(seconds=get_stale_after())
+
+
+def use_streaming(uploaded_file):
+    threshold = getattr(settings, "TIMELOG_STREAMING_THRESHOLD", 5 * 1024 * 1024)
+    return uploaded_file.size > threshold
+
+
+def file_checksum(uploaded_file):
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def get_delimiter(uploaded_file):
+    """
+    Returns the column delimiter of a CSV/TSV upload, or ``None`` for workbooks.
+    Plain ``.txt`` exports are sniffed from their header line.
+    """
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    if extension not in DELIMITED_EXTENSIONS:
+        return None
+    delimiter = DELIMITED_EXTENSIONS[extension]
+    if delimiter is None:
+        header = uploaded_file.readline()
+        uploaded_file.seek(0)
+        delimiter = "\t" if b"\t" in header else ","
+    return delimiter
+
+
+def read_csv_time_logs(csv_file, delimiter, extra_columns=(), **kwargs):
+    # Every column is read as text and typed once in prepare_time_logs with an
+    # explicit format, which keeps pandas on its C parsing paths.
+    columns = {*TIMELOG_COLUMNS, *extra_columns}
+    return pd.read_csv(
+        csv_file,
+        sep=delimiter,
+        usecols=lambda column: column in columns,
+        dtype=str,
+        engine="c",
+        **kwargs,
+    )
+
+
+def missing_columns(columns):
+    """
+    Returns:
+        list: The template columns missing from an upload's header, in
+        template order.
+    """
+    return [column for column in TIMELOG_COLUMNS if column not in columns]
+
+
+def read_header(uploaded_file, sheet_name=None):
+    """
+    Reads only the header row of an upload: the first line of a delimited file
+    or the first row of a workbook sheet, the active one by default.
+
+    Returns:
+        list: The column names, empty for an empty file.
+    """
+    delimiter = get_delimiter(uploaded_file)
+    if delimiter is not None:
+        first_line = uploaded_file.readline().decode("utf-8-sig", "replace")
+        uploaded_file.seek(0)
+        return next(csv.reader([first_line.rstrip("\r\n")], delimiter=delimiter), [])
+
+    workbook = load_workbook(uploaded_file, read_only=True)
+    try:
+        header = sheet_header(workbook[sheet_name] if sheet_name else workbook.active)
+    finally:
+        workbook.close()
+    uploaded_file.seek(0)
+    return header
+
+
+def sheet_header(sheet):
+    header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+    return [str(column) for column in header if column is not None]
+
+
+def read_time_logs(uploaded_file):
+    """
+    Reads a whole upload. Blank rows are dropped after reading, like in the
+    streamed chunks, so the index still counts every row of the sheet.
+    """
+    delimiter = get_delimiter(uploaded_file)
+    if delimiter is None:
+        data = pd.read_excel(uploaded_file)
+    else:
+        data = read_csv_time_logs(uploaded_file, delimiter, skip_blank_lines=False)
+    return data.dropna(how="all")
+
+
+def _to_datetime(values, fmt):
+    # Excel cells may already hold date/time objects instead of template text.
+    if values.dtype == object and pd.api.types.infer_dtype(values) not in (
+        "string",
+        "empty",
+    ):
+        values = values.map(
+            lambda value: (
+                value.strftime(fmt) if isinstance(value, (date, dt_time)) else value
+            )
+        )
+    return pd.to_datetime(values, format=fmt, errors="coerce")
+
+
+def _error_records(data, rows, errors):
+    columns = [
+        column
+        for column in [USERNAME_COLUMN, *TIMELOG_COLUMNS]
+        if column in data.columns
+    ]
+    cells = data[columns].astype(object)
+    cells = cells.where(cells.notna(), "").astype(str)
+    return [
+        {"row": int(row), "error": error, **dict(zip(columns, values))}
+        for row, error, values in zip(rows, errors, cells.itertuples(index=False))
+    ]
+
+
+def prepare_time_logs(data, first_row=2, repeated=()):
+    """
+    Parses and validates the template columns of an uploaded sheet and computes
+    ``total_work_time`` for the whole frame in one vectorized pass.
+
+    Every time is parsed onto the same base date, so the timedelta arithmetic
+    below gives exactly what ``WorkTimeEntry.save()`` computes per row. Rows
+    are reported by sheet row number, counted from ``first_row``. Dates in
+    ``repeated`` also appear in another chunk of the same upload, so their rows
+    are rejected as duplicates too.
+
+    Returns:
+        tuple: Frame of the valid rows, and a list of rejected rows carrying
+        their row number, error message and original cells.
+    """
+    parsed = {"date": _to_datetime(data["Date"], DATE_FORMAT)}
+    for field, column in TIME_COLUMNS.items():
+        parsed[field] = _to_datetime(data[column], TIME_FORMAT)
+    login, logout = parsed["login_time"], parsed["logout_time"]
+    breakout, breakin = parsed["breakout_time"], parsed["breakin_time"]
+
+    keys = pd.DataFrame({"date": parsed["date"]})
+    if USERNAME_COLUMN in data.columns:
+        keys[USERNAME_COLUMN] = data[USERNAME_COLUMN].astype(str).str.strip()
+
+    checks = [
+        (parsed[field].isna(), f"Invalid {column}")
+        for field, column in [("date", "Date"), *TIME_COLUMNS.items()]
+    ]
+    checks += [
+        (logout < login, "Logout time is before login time"),
+        (breakin < breakout, "Break-in time is before break-out time"),
+        ((breakout < login) | (breakin > logout), "Break is outside working hours"),
+        (parsed["date"] > pd.Timestamp(timezone.localdate()), "Date is in the future"),
+        (
+            (keys.duplicated(keep=False) | parsed["date"].isin(repeated))
+            & parsed["date"].notna(),
+            "Duplicate date in file",
+        ),
+    ]
+    errors = pd.Series("", index=data.index)
+    for failed, message in checks:
+        errors = errors.mask(failed, errors + message + "; ")
+    errors = errors.str.rstrip("; ")
+    invalid = errors != ""
+    valid = ~invalid
+
+    frame = pd.DataFrame({"date": parsed["date"][valid].dt.date})
+    for field in TIME_COLUMNS:
+        frame[field] = parsed[field][valid].dt.time
+    frame["total_work_time"] = ((logout - login) - (breakin - breakout))[valid]
+    if USERNAME_COLUMN in keys.columns:
+        frame["username"] = keys[USERNAME_COLUMN][valid]
+
+    rejected = _error_records(
+        data[invalid], first_row + data.index[invalid], errors[invalid]
+    )
+    return frame.reset_index(drop=True), rejected
+
+
+def entry_rows(user_id, frame):
+    return list(
+        zip(
+            [user_id] * len(frame),
+            frame["date"],
+            frame["login_time"],
+            frame["logout_time"],
+            frame["breakout_time"],
+            frame["breakin_time"],
+            frame["total_work_time"].dt.to_pytimedelta(),
+        )
+    )
+
+
+def upsert_sql(row_count, mode):
+    """
+    Builds one ``INSERT ... ON CONFLICT`` statement for ``row_count`` entries.
+
+    In ``upsert`` mode existing days are only rewritten when a field actually
+    differs, and ``RETURNING (xmax = 0)`` tells inserted rows from updated
+    ones. Rows that come back from neither branch were unchanged.
+    """
+    quote = connection.ops.quote_name
+    columns = ["user_id", "date", *ENTRY_FIELDS]
+    values = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * row_count)
+
+    if mode == "insert":
+        conflict = "DO NOTHING"
+    else:
+        assignments = ", ".join(
+            f"{quote(f)} = EXCLUDED.{quote(f)}" for f in ENTRY_FIELDS
+        )
+        current = ", ".join(f"entry.{quote(f)}" for f in ENTRY_FIELDS)
+        incoming = ", ".join(f"EXCLUDED.{quote(f)}" for f in ENTRY_FIELDS)
+        conflict = (
+            f"DO UPDATE SET {assignments} "
+            f"WHERE ({current}) IS DISTINCT FROM ({incoming})"
+        )
+
+    return (
+        f"INSERT INTO {quote(WorkTimeEntry._meta.db_table)} AS entry "
+        f"({', '.join(quote(c) for c in columns)}) VALUES {values} "
+        f"ON CONFLICT ({quote('user_id')}, {quote('date')}) {conflict} "
+        f"RETURNING (xmax = 0)"
+    )
+
+
+def write_entries(user_id, frame, batch_size, mode="upsert"):
+    """
+    Writes ``frame`` for one user with a single upsert statement per batch and
+    sends ``timelogs_imported`` for the months it changed.
+
+    Returns:
+        Counter: ``inserted``, ``updated`` and ``unchanged`` row counts.
+    """
+    # A statement may not update the same (user, date) twice; the last row wins.
+    frame = frame.drop_duplicates("date", keep="last")
+    counts = Counter(inserted=0, updated=0, unchanged=0)
+    with connection.cursor() as cursor:
+        for start in range(0, len(frame), batch_size):
+            rows = entry_rows(user_id, frame.iloc[start : start + batch_size])
+            cursor.execute(
+                upsert_sql(len(rows), mode),
+                [value for row in rows for value in row],
+            )
+            written = [inserted for (inserted,) in cursor.fetchall()]
+            counts["inserted"] += sum(written)
+            counts["updated"] += len(written) - sum(written)
+            counts["unchanged"] += len(rows) - len(written)
+
+    if counts["inserted"] or counts["updated"]:
+        dates = pd.to_datetime(frame["date"])
+        months = pd.DataFrame(
+            {"year": dates.dt.year, "month": dates.dt.month}
+        ).drop_duplicates()
+        timelogs_imported.send(
+            sender=WorkTimeEntry,
+            keys={
+                (user_id, int(year), int(month))
+                for year, month in months.itertuples(index=False)
+            },
+            inserted=counts["inserted"],
+        )
+    return counts
+
+
+def _entry_keys(user_ids, dates):
+    keys = pd.DataFrame(
+        {"user_id": pd.Series(user_ids).to_numpy(), "date": pd.Series(dates).to_numpy()}
+    )
+    return pd.Index(pd.util.hash_pandas_object(keys, index=False).to_numpy())
+
+
+def _comparable(field, values):
+    values = pd.Series(values)
+    if field == "total_work_time":
+        seconds = pd.to_timedelta(values).dt.total_seconds()
+        missing = seconds.isna()
+        hours, remainder = divmod(seconds.fillna(0).astype(int), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        text = (
+            hours.astype(str).str.zfill(2)
+            + ":"
+            + minutes.astype(str).str.zfill(2)
+            + ":"
+            + seconds.astype(str).str.zfill(2)
+        )
+        return text.mask(missing, "None").to_numpy()
+    return values.astype(str).to_numpy()
+
+
+def diff_entries(frame, limit=DRY_RUN_CHANGE_LIMIT):
+    """
+    Compares parsed rows of one or more users against their stored timelogs
+    without writing anything.
+
+    Stored entries for the file's users and date span are loaded with a single
+    range query and matched on hashed (user, date) keys, so the comparison is
+    set-based however many rows the file has.
+
+    Returns:
+        tuple: Counter of rows that would be ``inserted``, ``updated`` or left
+        ``unchanged``, and field-level deltas of the first ``limit`` changed rows.
+    """
+    counts = Counter(inserted=0, updated=0, unchanged=0)
+    frame = frame.drop_duplicates(["user_id", "date"], keep="last")
+    if frame.empty:
+        return counts, []
+
+    dates = pd.to_datetime(frame["date"])
+    existing = pd.DataFrame.from_records(
+        WorkTimeEntry.objects.filter(
+            user_id__in=frame["user_id"].unique().tolist(),
+            date__range=(dates.min().date(), dates.max().date()),
+        ).values_list("user_id", "date", *ENTRY_FIELDS),
+        columns=["user_id", "date", *ENTRY_FIELDS],
+    )
+    existing.index = _entry_keys(existing["user_id"], pd.to_datetime(existing["date"]))
+
+    keys = _entry_keys(frame["user_id"], dates)
+    matched = keys.isin(existing.index)
+    current = existing.loc[keys[matched]]
+    incoming = frame[matched]
+
+    before = {field: _comparable(field, current[field]) for field in ENTRY_FIELDS}
+    after = {field: _comparable(field, incoming[field]) for field in ENTRY_FIELDS}
+    differs = pd.DataFrame(
+        {field: before[field] != after[field] for field in ENTRY_FIELDS}
+    )
+    changed = differs.any(axis=1).to_numpy()
+
+    counts["inserted"] = int((~matched).sum())
+    counts["updated"] = int(changed.sum())
+    counts["unchanged"] = int(matched.sum() - changed.sum())
+
+    changes = []
+    for position in changed.nonzero()[0][:limit]:
+        changes.append(
+            {
+                "user_id": int(incoming["user_id"].iloc[position]),
+                "date": str(incoming["date"].iloc[position]),
+                "fields": {
+                    field: [before[field][position], after[field][position]]
+                    for field in ENTRY_FIELDS
+                    if differs[field].iloc[position]
+                },
+            }
+        )
+    return counts, changes
+
+
+def keep_errors(errors, rejected):
+    """
+    Appends rejected rows to ``errors`` until it holds
+    ``TIMELOG_IMPORT_ERROR_LIMIT`` of them. ``rows_failed`` still counts
+    every rejected row, so the report stays small however bad the file is.
+
+    Returns:
+        bool: Whether any row was appended.
+    """
+    room = max(get_error_limit() - len(errors), 0)
+    errors.extend(rejected[:room])
+    return bool(room and rejected)
+
+
+def record_import(user, uploaded_file, mode, counts, rejected, changes=()):
+    """
+    Stores a finished in-request import, so its error report can be downloaded
+    like the report of a background job.
+    """
+    return TimelogImport.objects.create(
+        user=user,
+        file_name=uploaded_file.name,
+        checksum=file_checksum(uploaded_file),
+        mode=mode,
+        status="done",
+        rows_total=counts.total() + len(rejected),
+        rows_committed=counts.total() + len(rejected),
+        rows_imported=counts["inserted"],
+        rows_updated=counts["updated"],
+        rows_unchanged=counts["unchanged"],
+        rows_failed=len(rejected),
+        errors=rejected[: get_error_limit()],
+        changes=list(changes),
+        started_at=timezone.now(),
+        finished_at=timezone.now(),
+    )
+
+
+def import_time_logs(user, uploaded_file, batch_size=None, mode="upsert"):
+    """
+    Bulk-writes the valid rows of an uploaded sheet for ``user``.
+
+    Rows are written in upsert batches inside a single transaction and one
+    summary activity is recorded for the whole upload. Rows failing validation
+    are skipped and kept on the recorded ``TimelogImport``. In ``dry_run`` mode
+    nothing is written and the counts describe what the upload would change.
+
+    Returns:
+        ImportResult: Row counts, the elapsed time and the recorded import.
+    """
+    batch_size = get_batch_size(batch_size)
+    started = time.perf_counter()
+    frame, rejected = prepare_time_logs(read_time_logs(uploaded_file))
+
+    with transaction.atomic():
+        if mode == "dry_run":
+            counts, changes = diff_entries(frame.assign(user_id=user.pk))
+        else:
+            counts, changes = write_entries(user.pk, frame, batch_size, mode), []
+            log_activity(user, f"Upload Work Time ({counts.total()} rows)")
+        job = record_import(user, uploaded_file, mode, counts, rejected, changes)
+
+    return ImportResult(
+        rows=counts.total(),
+        seconds=time.perf_counter() - started,
+        failed=len(rejected),
+        job_id=job.pk,
+        **counts,
+    )
+
+
+def iter_excel_chunks(excel_file, chunk_size, skip_rows=0):
+    """
+    Yields ``(rows_read, DataFrame)`` chunks of the active sheet using
+    openpyxl's read-only mode, so only one chunk is held in memory at a time.
+    """
+    workbook = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        rows = islice(rows, skip_rows, None)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield len(chunk), pd.DataFrame(chunk, columns=header).dropna(how="all")
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(csv_file, delimiter, chunk_size, skip_rows=0):
+    reader = read_csv_time_logs(
+        csv_file,
+        delimiter,
+        chunksize=chunk_size,
+        skiprows=range(1, skip_rows + 1),
+        skip_blank_lines=False,
+    )
+    # Blank lines are kept while reading so the checkpoint counts file lines,
+    # and every chunk is indexed from 0 like the workbook chunks.
+    with reader:
+        for frame in reader:
+            yield len(frame), frame.reset_index(drop=True).dropna(how="all")
+
+
+def iter_upload_chunks(uploaded_file, chunk_size, skip_rows=0):
+    delimiter = get_delimiter(uploaded_file)
+    if delimiter is None:
+        return iter_excel_chunks(uploaded_file, chunk_size, skip_rows)
+    return iter_csv_chunks(uploaded_file, delimiter, chunk_size, skip_rows)
+
+
+def find_repeated_dates(uploaded_file, chunk_size):
+    """
+    Finds the dates given on more than one row of an upload, reading it chunk
+    by chunk, so a streamed import rejects every copy like a whole-file import
+    instead of letting the last chunk win.
+
+    Returns:
+        list: The repeated dates as timestamps.
+    """
+    counts = pd.Series(dtype="int64")
+    for _, data in iter_upload_chunks(uploaded_file, chunk_size):
+        dates = _to_datetime(data["Date"], DATE_FORMAT).dropna()
+        counts = counts.add(dates.value_counts(), fill_value=0)
+    uploaded_file.seek(0)
+    return list(counts.index[counts > 1])
+
+
+def count_rows(uploaded_file):
+    """
+    Returns the number of data rows in an upload for progress reporting.
+    Workbooks report their sheet dimensions, delimited files are line-counted.
+    """
+    if get_delimiter(uploaded_file) is None:
+        workbook = load_workbook(uploaded_file, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        uploaded_file.seek(0)
+        return max_row - 1 if max_row else None
+    lines = sum(chunk.count(b"\n") for chunk in uploaded_file.chunks())
+    uploaded_file.seek(0)
+    return max(lines - 1, 0)
+
+
+def enqueue_import(user, uploaded_file, mode="upsert"):
+    """
+    Stores an upload on disk and queues it as a ``TimelogImport`` job.
+
+    Uploading a file whose job never finished in the same mode returns that
+    job instead. A failed job, or a running one whose worker stopped sending
+    heartbeats, is requeued so it resumes after its last committed chunk.
+    """
+    checksum = file_checksum(uploaded_file)
+    job = (
+        TimelogImport.objects.filter(user=user, checksum=checksum, mode=mode)
+        .exclude(status="done")
+        .order_by("-created_at")
+        .first()
+    )
+    if job is None:
+        job = TimelogImport(
+            user=user, file_name=uploaded_file.name, checksum=checksum, mode=mode
+        )
+        job.file.save(uploaded_file.name, uploaded_file)
+    elif job.status == "failed" or (
+        job.status == "running" and job.updated_at < stale_before()
+    ):
+        job.status = "queued"
+        job.save(update_fields=["status", "updated_at"])
+    return job
+
+
+def _report_head(field, size):
+    return Func(
+        F(field),
+        Value(f"$[0 to {size - 1}]"),
+        function="jsonb_path_query_array",
+        template="%(function)s(%(expressions)s::jsonpath)",
+        output_field=JSONField(),
+    )
+
+
+def with_report_previews(jobs, size=STATUS_PREVIEW_SIZE):
+    """
+    Defers the error and change reports of ``jobs`` and annotates only their
+    first ``size`` entries as ``errors_preview`` and ``changes_preview``, so
+    polling a job's progress does not load its whole report.
+    """
+    return jobs.defer("errors", "changes").annotate(
+        errors_preview=_report_head("errors", size),
+        changes_preview=_report_head("changes", size),
+    )
+
+
+def claim_next_job():
+    """
+    Claims the oldest queued job, or a running job whose heartbeat is older
+    than ``TIMELOG_IMPORT_STALE_AFTER`` because its worker crashed or was
+    killed. Either way the job resumes after its last committed chunk.
+    """
+    with transaction.atomic():
+        job = (
+            TimelogImport.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="queued") | Q(status="running", updated_at__lt=stale_before())
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is not None:
+            job.status = "running"
+            job.started_at = timezone.now()
+            job.save(update_fields=["status", "started_at", "updated_at"])
+    return job
+
+
+def run_import_job(job, chunk_size=None, batch_size=None):
+    """
+    Imports a stored upload chunk by chunk, committing after every chunk.
+
+    ``rows_committed`` and the error report are advanced in the same
+    transaction as each chunk's rows, so a job that is interrupted or fails
+    can be run again and resumes after the last committed chunk instead of
+    duplicating its rows or errors. The stored upload is deleted once the job
+    is done.
+
+    Returns:
+        ImportResult: Rows imported by this run, elapsed time and resume offset.
+    """
+    chunk_size = get_chunk_size(chunk_size)
+    batch_size = get_batch_size(batch_size)
+    started = time.perf_counter()
+    resumed_from = job.rows_committed
+    counts = Counter(inserted=0, updated=0, unchanged=0)
+
+    job.status = "running"
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=["status", "started_at", "updated_at"])
+
+    try:
+        with job.file.open("rb") as upload:
+            if job.rows_total is None:
+                job.rows_total = count_rows(upload)
+                job.save(update_fields=["rows_total", "updated_at"])
+            repeated = find_repeated_dates(upload, chunk_size)
+            for rows_read, data in iter_upload_chunks(upload, chunk_size, resumed_from):
+                frame, rejected = prepare_time_logs(
+                    data, job.rows_committed + 2, repeated
+                )
+                with transaction.atomic():
+                    if job.mode == "dry_run":
+                        chunk, changes = diff_entries(
+                            frame.assign(user_id=job.user_id),
+                            DRY_RUN_CHANGE_LIMIT - len(job.changes),
+                        )
+                        job.changes.extend(changes)
+                    else:
+                        chunk = write_entries(job.user_id, frame, batch_size, job.mode)
+                        changes = []
+                    job.rows_committed += rows_read
+                    job.rows_imported += chunk["inserted"]
+                    job.rows_updated += chunk["updated"]
+                    job.rows_unchanged += chunk["unchanged"]
+                    job.rows_failed += len(rejected)
+                    fields = [
+                        "rows_committed",
+                        "rows_imported",
+                        "rows_updated",
+                        "rows_unchanged",
+                        "rows_failed",
+                        "updated_at",
+                    ]
+                    # Only rewrite the reports while they still grow
+                    if keep_errors(job.errors, rejected):
+                        fields.append("errors")
+                    if changes:
+                        fields.append("changes")
+                    job.save(update_fields=fields)
+                counts.update(chunk)
+    except Exception as exc:
+        # Drop the progress and errors of the chunk that was rolled back
+        job.refresh_from_db(fields=COMMITTED_FIELDS)
+        job.status = "failed"
+        # +2 turns the 0-based data offset into a sheet row below the header.
+        job.errors.append({"row": job.rows_committed + 2, "error": str(exc)})
+    else:
+        job.status = "done"
+    fields = ["status", "errors", "finished_at", "updated_at"]
+    if job.status == "done":
+        # Failed jobs keep their upload so they can resume
+        job.file.delete(save=False)
+        fields.append("file")
+        if job.mode != "dry_run":
+            log_activity(
+                job.user,
+                f"Upload Work Time ({job.rows_imported} added, "
+                f"{job.rows_updated} updated)",
+            )
+    job.finished_at = timezone.now()
+    job.save(update_fields=fields)
+
+    return ImportResult(
+        rows=counts.total(),
+        seconds=time.perf_counter() - started,
+        resumed_from=resumed_from,
+        failed=job.rows_failed,
+        job_id=job.pk,
+        **counts,
+    )
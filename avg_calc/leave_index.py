@@ -0,0 +1,92 @@
+import numpy as np
+from django.contrib.postgres.fields import DateRangeField
+from django.db.models import Exists, F, Func, OuterRef
+
+from avg_calc.models import Leave
+
+# Width of each user's slot on the shared day axis used by LeaveIndex, in days.
+USER_SPAN = 1 << 20
+
+
+class LeavePeriod(Func):
+    """
+    ``daterange(start_date, end_date, '[]')``, the inclusive period of a leave.
+    Matches the expression of the GiST index on ``Leave`` so ``@>`` lookups can
+    use it.
+    """
+
+    function = "daterange"
+    template = "%(function)s(%(expressions)s, '[]')"
+    output_field = DateRangeField()
+
+    def __init__(self, start="start_date", end="end_date", **extra):
+        super().__init__(F(start), F(end), **extra)
+
+
+def on_leave(user=OuterRef("user"), day=OuterRef("date")):
+    """
+    An ``EXISTS`` subquery that is true when ``day`` falls inside one of the
+    user's leaves. Negate it to exclude leave days with an anti-join.
+    """
+    return Exists(
+        Leave.objects.alias(period=LeavePeriod()).filter(
+            user=user, period__contains=day
+        )
+    )
+
+
+class LeaveIndex:
+    """
+    Answers bulk "is day D a leave day for user U" questions in memory.
+
+    Leaves are laid out on one integer axis with a slot of ``USER_SPAN`` days
+    per user, overlapping leaves are merged and lookups are a single
+    ``np.searchsorted`` over the sorted, disjoint intervals.
+    """
+
+    def __init__(self, user_ids, start_dates, end_dates):
+        users = np.asarray(user_ids, dtype=np.int64)
+        starts = users * USER_SPAN + _day_numbers(start_dates)
+        ends = users * USER_SPAN + _day_numbers(end_dates)
+
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        if not len(starts):
+            self.starts = self.ends = starts
+            return
+
+        # A new interval starts wherever a leave begins after all earlier ones end
+        reach = np.maximum.accumulate(ends)
+        breaks = np.flatnonzero(np.r_[True, starts[1:] > reach[:-1] + 1])
+        self.starts = starts[breaks]
+        self.ends = np.maximum.reduceat(ends, breaks)
+
+    @classmethod
+    def for_range(cls, start_date, end_date, users=None):
+        """
+        Builds the index from the leaves overlapping a date range with one
+        query, optionally limited to some users.
+        """
+        leaves = Leave.objects.filter(
+            start_date__lte=end_date, end_date__gte=start_date
+        )
+        if users is not None:
+            leaves = leaves.filter(user__in=users)
+        rows = list(leaves.values_list("user_id", "start_date", "end_date"))
+        user_ids, start_dates, end_dates = zip(*rows) if rows else ((), (), ())
+        return cls(user_ids, start_dates, end_dates)
+
+    def contains(self, user_ids, days):
+        """
+        Returns a boolean array telling for each (user, day) pair whether the
+        day is covered by a leave. Scalars broadcast against arrays.
+        """
+        keys = np.asarray(user_ids, dtype=np.int64) * USER_SPAN + _day_numbers(days)
+        if not len(self.starts):
+            return np.zeros(keys.shape, dtype=bool)
+        position = np.searchsorted(self.starts, keys, side="right") - 1
+        return (position >= 0) & (keys <= self.ends[np.maximum(position, 0)])
+
+
+def _day_numbers(days):
+    return np.asarray(days, dtype="datetime64[D]").astype(np.int64)
@@ -0,0 +1,75 @@
+import io
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from avg_calc.imports import (
+    DATE_FORMAT,
+    TIMELOG_COLUMNS,
+    iter_excel_chunks,
+    prepare_time_logs,
+    read_csv_time_logs,
+)
+
+
+class Command(BaseCommand):
+    help = "Compares XLSX and CSV timelog parsing speed on generated data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        data = self.sample_frame(rows)
+
+        xlsx = io.BytesIO()
+        data.to_excel(xlsx, index=False, engine="openpyxl")
+        csv = io.BytesIO(data.to_csv(index=False).encode())
+        self.stdout.write(
+            f"{rows} rows: xlsx {len(xlsx.getvalue()) // 1024} KiB, "
+            f"csv {len(csv.getvalue()) // 1024} KiB"
+        )
+
+        def xlsx_pandas():
+            xlsx.seek(0)
+            prepare_time_logs(pd.read_excel(xlsx))
+
+        def xlsx_streaming():
+            xlsx.seek(0)
+            for _, frame in iter_excel_chunks(xlsx, options["chunk_size"]):
+                prepare_time_logs(frame)
+
+        def csv_fast_path():
+            csv.seek(0)
+            prepare_time_logs(read_csv_time_logs(csv, ","))
+
+        for label, parse in [
+            ("xlsx (pandas)", xlsx_pandas),
+            ("xlsx (streaming)", xlsx_streaming),
+            ("csv", csv_fast_path),
+        ]:
+            started = time.perf_counter()
+            parse()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:<18} {elapsed:8.3f}s  {rows / elapsed:12,.0f} rows/sec"
+            )
+
+    def sample_frame(self, rows):
+        start = date(2010, 1, 1)
+        return pd.DataFrame(
+            {
+                "Date": [
+                    (start + timedelta(days=i % 3650)).strftime(DATE_FORMAT)
+                    for i in range(rows)
+                ],
+                "Login Time": "09:30:00",
+                "Logout Time": "18:45:00",
+                "Break-Out Time": "13:00:00",
+                "Break-In Time": "13:40:00",
+            },
+            columns=TIMELOG_COLUMNS,
+        )
@@ -0,0 +1,62 @@
+import time
+import tracemalloc
+from datetime import date
+from datetime import time as dt_time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from avg_calc.reports import PDF_ENGINES
+
+
+class Command(BaseCommand):
+    help = "Compares worklog PDF render time and peak memory per engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[31, 1000])
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        user = User(username="benchmark", first_name="Bench", last_name="Mark")
+        for rows in options["rows"]:
+            data, summary = self.sample_month(rows)
+            for engine, render in PDF_ENGINES.items():
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    content = render(user, 2024, 1, data, summary)
+                    timings.append(time.perf_counter() - started)
+
+                tracemalloc.start()
+                render(user, 2024, 1, data, summary)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f"{rows:>5} rows  {engine:<10} {min(timings):8.3f}s  "
+                    f"peak {peak / 1024 / 1024:7.1f} MiB  "
+                    f"{len(content or b'') // 1024:>5} KiB"
+                )
+
+    def sample_month(self, rows):
+        start = date(2024, 1, 1)
+        work = timedelta(hours=8, minutes=45)
+        data = [
+            (
+                start + timedelta(days=i),
+                dt_time(9, 30),
+                dt_time(18, 45),
+                dt_time(13, 0),
+                dt_time(13, 30),
+                work,
+            )
+            for i in range(rows)
+        ]
+        summary = {
+            "total_seconds": int(work.total_seconds()) * rows,
+            "total_break_seconds": 1800 * rows,
+            "entry_count": rows,
+            "half_day_count": 0,
+        }
+        return data, summary
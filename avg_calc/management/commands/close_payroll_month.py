@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from avg_calc.payroll import close_month, reopen_month
+
+
+class Command(BaseCommand):
+    help = "Freezes a month's payroll into snapshots, or reopens a closed month."
+
+    def add_arguments(self, parser):
+        parser.add_argument("year", type=int)
+        parser.add_argument("month", type=int, choices=range(1, 13))
+        parser.add_argument(
+            "--reopen",
+            action="store_true",
+            help="Drop the snapshot so the month is computed from live data again.",
+        )
+
+    def handle(self, *args, year, month, reopen, **options):
+        if reopen:
+            if not reopen_month(year, month):
+                raise CommandError(f"Payroll for {month}/{year} is not closed")
+            self.stdout.write(
+                self.style.SUCCESS(f"Reopened payroll for {month}/{year}")
+            )
+            return
+
+        period = close_month(year, month)
+        if period is None:
+            raise CommandError(f"Payroll for {month}/{year} is already closed")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Closed payroll for {month}/{year}: {period.headcount} users, "
+                f"balance {period.total_balance}"
+            )
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from avg_calc.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the monthly work rollups from all timelog entries."
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} monthly rollups"))
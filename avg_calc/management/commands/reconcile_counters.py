@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from avg_calc.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the organization counters shown on the admin dashboard."
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters()
+        for name, value in drift.items():
+            self.stdout.write(f"{name:<10} drift {value}")
+        self.stdout.write(self.style.SUCCESS("Counters reconciled"))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from avg_calc.imports import claim_next_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = "Runs queued timelog import jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling for new jobs.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Importing {job.file_name} for {job.user.username}")
+            result = run_import_job(job)
+            if job.status == "done":
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Imported {result.rows} rows: {result.inserted} added, "
+                        f"{result.updated} updated, {result.unchanged} unchanged "
+                        f"({result.rows_per_second:.0f} rows/sec)"
+                    )
+                )
+            else:
+                self.stdout.write(
+                    self.style.ERROR(f"Import failed: {job.errors[-1]['error']}")
+                )
@@ -1,8 +1,17 @@
+from calendar import day_abbr
+from datetime import datetime, timedelta
+
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import ExtractIsoWeekDay
 from django.urls import reverse_lazy
 from django.utils.functional import lazy
 
-from avg_calc.models import RecentActivity
+from avg_calc.leave_index import on_leave
+from avg_calc.models import MonthlyWorkRollup, RecentActivity, WorkTimeEntry
 from avg_calc.templatetags.custom_filter import format_duration
+from avg_calc.work_calendar import user_working_days
+
+TARGET_WORK_TIME = timedelta(hours=8, minutes=40)
 
 safe_reverse = lambda name: lazy(lambda: str(reverse_lazy(name)), str)
 safe_reverse_with_anchor = lambda name, anchor: lazy(
@@ -14,7 +23,54 @@ def log_activity(user, description):
     RecentActivity.objects.create(user=user, description=description)
 
 
-def get_user_stats(entries, total_work_seconds, need_time, average_time):
+def get_month_totals(user, start_date, end_date):
+    """
+    Aggregates a user's entries between two dates in a single query.
+
+    Entries logged on a day covered by one of the user's leaves are left out of
+    the totals and reported separately.
+
+    Returns:
+        dict: ``total_seconds``, ``entry_count``, ``first_day``, ``last_day``,
+        ``leave_seconds``, ``leave_count`` and ``weekday_seconds`` (Monday first).
+    """
+    worked = Q(on_leave=False)
+    totals = (
+        WorkTimeEntry.objects.filter(user=user, date__range=[start_date, end_date])
+        .annotate(on_leave=on_leave(), weekday=ExtractIsoWeekDay("date"))
+        .aggregate(
+            total=Sum("total_work_time", filter=worked),
+            count=Count("id", filter=worked),
+            first_day=Min("date", filter=worked),
+            last_day=Max("date", filter=worked),
+            leave_total=Sum("total_work_time", filter=~worked),
+            leave_count=Count("id", filter=~worked),
+            **{
+                f"weekday_{weekday}": Sum(
+                    "total_work_time", filter=worked & Q(weekday=weekday)
+                )
+                for weekday in range(1, 8)
+            },
+        )
+    )
+
+    def seconds(duration):
+        return duration.total_seconds() if duration else 0
+
+    return {
+        "total_seconds": seconds(totals["total"]),
+        "entry_count": totals["count"],
+        "first_day": totals["first_day"],
+        "last_day": totals["last_day"],
+        "leave_seconds": seconds(totals["leave_total"]),
+        "leave_count": totals["leave_count"],
+        "weekday_seconds": [
+            seconds(totals[f"weekday_{weekday}"]) for weekday in range(1, 8)
+        ],
+    }
+
+
+def get_user_stats(entry_count, total_work_seconds, need_time, average_time):
     return [
         {
             "title": "Total Time This Month",
@@ -23,7 +79,7 @@ def get_user_stats(entries, total_work_seconds, need_time, average_time):
                 if total_work_seconds
                 else "0 hrs, 0 mins"
             ),
-            "description": f"Across {entries.count()} working days",
+            "description": f"Across {entry_count} working days",
             "icon": "fas fa-clock",
             "icon_color": "text-indigo-500",
         },
@@ -36,7 +92,7 @@ def get_user_stats(entries, total_work_seconds, need_time, average_time):
         },
         {
             "title": "Working Days",
-            "value": entries.count(),
+            "value": entry_count,
             "description": "Excluding weekends & holidays",
             "icon": "fas fa-calendar-alt",
             "icon_color": "text-purple-500",
@@ -51,6 +107,123 @@ def get_user_stats(entries, total_work_seconds, need_time, average_time):
     ]
 
 
+def get_monthly_trends(first, last, user_id=None):
+    """
+    Returns month-by-month totals between two ``(year, month)`` pairs,
+    inclusive, for one user or the whole organization.
+
+    Totals are read from ``MonthlyWorkRollup`` with a single grouped query.
+    Months without timelogs are included with zero totals.
+
+    Returns:
+        list: One dict per month with ``year``, ``month``, ``total_seconds``,
+        ``entry_count``, ``user_count``, ``average_seconds`` (per logged day)
+        and ``target_gap_seconds`` (average minus the daily target).
+    """
+    first_period = first[0] * 12 + first[1] - 1
+    last_period = last[0] * 12 + last[1] - 1
+
+    rollups = MonthlyWorkRollup.objects.alias(
+        period=F("year") * 12 + F("month") - 1
+    ).filter(period__range=(first_period, last_period))
+    if user_id is not None:
+        rollups = rollups.filter(user_id=user_id)
+    totals = {
+        (row["year"], row["month"]): row
+        for row in rollups.values("year", "month")
+        .annotate(
+            total=Sum("total_seconds"),
+            entries=Sum("entry_count"),
+            users=Count("user_id", distinct=True),
+        )
+        .order_by()
+    }
+
+    target_seconds = TARGET_WORK_TIME.total_seconds()
+    trends = []
+    for period in range(first_period, last_period + 1):
+        year, month = divmod(period, 12)
+        row = totals.get((year, month + 1), {})
+        total_seconds = row.get("total") or 0
+        entry_count = row.get("entries") or 0
+        average_seconds = total_seconds / entry_count if entry_count else 0
+        trends.append(
+            {
+                "year": year,
+                "month": month + 1,
+                "total_seconds": total_seconds,
+                "entry_count": entry_count,
+                "user_count": row.get("users") or 0,
+                "average_seconds": average_seconds,
+                "target_gap_seconds": (
+                    average_seconds - target_seconds if entry_count else 0
+                ),
+            }
+        )
+    return trends
+
+
+def get_user_dashboard(user, year, month):
+    """
+    Computes the user's half of the dashboard for one month: stat cards,
+    target status and month totals. The result is plain data so it can be
+    cached between requests.
+    """
+    start_of_month = datetime(year, month, 1).date()
+    end_of_month = start_of_month.replace(
+        month=(month % 12) + 1 if month < 12 else 1,
+        year=year + 1 if month == 12 else year,
+        day=1,
+    ) - timedelta(days=1)
+
+    days_count = (end_of_month - start_of_month).days + 1
+    working_days_count = len(user_working_days(user, start_of_month, end_of_month))
+
+    # Entries logged on leave days do not count towards the month
+    month_totals = get_month_totals(user, start_of_month, end_of_month)
+    total_work_seconds = month_totals["total_seconds"]
+    entry_count = month_totals["entry_count"]
+
+    average_work_seconds = (
+        total_work_seconds / working_days_count if working_days_count else 0
+    )
+
+    additional_seconds_per_day = 0
+    need_time = 0
+    overtime = 0
+    if (
+        working_days_count > 0
+        and average_work_seconds < TARGET_WORK_TIME.total_seconds()
+    ):
+        total_target_seconds = TARGET_WORK_TIME.total_seconds() * working_days_count
+        time_difference_seconds = total_target_seconds - total_work_seconds
+        additional_seconds_per_day = time_difference_seconds / days_count
+        need_time = additional_seconds_per_day / 60
+    elif working_days_count > 0:
+        total_target_seconds = TARGET_WORK_TIME.total_seconds() * working_days_count
+        additional_overtime = total_work_seconds - total_target_seconds
+        overtime = (additional_overtime / days_count) / 60
+
+    average_time = total_work_seconds / entry_count if entry_count else 0
+
+    # Dynamic stat cards for user dashboard
+    user_stats = get_user_stats(
+        entry_count, total_work_seconds, need_time, average_time
+    )
+
+    # Dynamic target status
+    target_status = get_target_status(
+        average_time, TARGET_WORK_TIME.total_seconds(), need_time
+    )
+
+    return {
+        "user_stats": user_stats,
+        "target_status": target_status,
+        "month_totals": month_totals,
+        "weekday_totals": list(zip(day_abbr, month_totals["weekday_seconds"])),
+    }
+
+
 def get_target_status(average_time, target_seconds, need_time):
     if average_time >= target_seconds:
         return {
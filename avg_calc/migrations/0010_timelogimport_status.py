@@ -0,0 +1,74 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+def set_status_from_completed(apps, schema_editor):
+    TimelogImport = apps.get_model("avg_calc", "TimelogImport")
+    TimelogImport.objects.filter(completed=True).update(status="done")
+    # Imports from before jobs kept no stored file, so they cannot be resumed.
+    TimelogImport.objects.filter(completed=False).update(status="failed")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0009_timelogimport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timelogimport",
+            name="errors",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="file",
+            field=models.FileField(blank=True, upload_to="imports/"),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="rows_failed",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="rows_imported",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="rows_total",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("running", "Running"),
+                    ("done", "Done"),
+                    ("failed", "Failed"),
+                ],
+                default="queued",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(set_status_from_completed, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="timelogimport",
+            name="completed",
+        ),
+    ]
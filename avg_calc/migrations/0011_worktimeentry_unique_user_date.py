@@ -0,0 +1,93 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+BACKUP_TABLE = "avg_calc_worktimeentry_duplicate"
+
+
+def archive_duplicate_entries(apps, schema_editor):
+    """
+    Re-uploaded sheets left several entries per day. The latest entry of each
+    day is kept; the older ones are copied to ``BACKUP_TABLE`` before they are
+    deleted, so they can still be reviewed or restored by hand.
+
+    ``BACKUP_TABLE`` is not a model and no later migration touches it. Drop it
+    once the archived entries are no longer needed, or migrate back past this
+    migration to restore them.
+    """
+    WorkTimeEntry = apps.get_model("avg_calc", "WorkTimeEntry")
+    quote = schema_editor.quote_name
+    table = quote(WorkTimeEntry._meta.db_table)
+    duplicates = (
+        f"FROM {table} entry WHERE EXISTS (SELECT 1 FROM {table} newer "
+        f"WHERE newer.user_id = entry.user_id AND newer.date = entry.date "
+        f"AND newer.id > entry.id)"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {duplicates}")
+        (count,) = cursor.fetchone()
+    if count:
+        schema_editor.execute(
+            f"CREATE TABLE {quote(BACKUP_TABLE)} AS SELECT entry.* {duplicates}"
+        )
+        schema_editor.execute(f"DELETE {duplicates}")
+
+
+def restore_duplicate_entries(apps, schema_editor):
+    """
+    Puts the entries archived in ``BACKUP_TABLE`` back and drops the table.
+    Nothing is restored when the table does not exist, either because there
+    were no duplicates or because it was already dropped.
+    """
+    WorkTimeEntry = apps.get_model("avg_calc", "WorkTimeEntry")
+    connection = schema_editor.connection
+    if BACKUP_TABLE not in connection.introspection.table_names():
+        return
+    quote = schema_editor.quote_name
+    columns = ", ".join(
+        quote(field.column) for field in WorkTimeEntry._meta.concrete_fields
+    )
+    schema_editor.execute(
+        f"INSERT INTO {quote(WorkTimeEntry._meta.db_table)} ({columns}) "
+        f"SELECT {columns} FROM {quote(BACKUP_TABLE)}"
+    )
+    schema_editor.execute(f"DROP TABLE {quote(BACKUP_TABLE)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0010_timelogimport_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timelogimport",
+            name="mode",
+            field=models.CharField(
+                choices=[
+                    ("upsert", "Add new days and update changed ones"),
+                    ("insert", "Add new days only"),
+                ],
+                default="upsert",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="rows_unchanged",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="timelogimport",
+            name="rows_updated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(archive_duplicate_entries, restore_duplicate_entries),
+        migrations.AddConstraint(
+            model_name="worktimeentry",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="unique_worktimeentry_user_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0011_worktimeentry_unique_user_date"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timelogimport",
+            name="changes",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name="timelogimport",
+            name="mode",
+            field=models.CharField(
+                choices=[
+                    ("upsert", "Add new days and update changed ones"),
+                    ("insert", "Add new days only"),
+                    ("dry_run", "Preview changes without saving"),
+                ],
+                default="upsert",
+                max_length=10,
+            ),
+        ),
+    ]
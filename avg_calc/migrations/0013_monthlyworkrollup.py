@@ -0,0 +1,96 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:45
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_rollups(apps, schema_editor):
+    WorkTimeEntry = apps.get_model("avg_calc", "WorkTimeEntry")
+    MonthlyWorkRollup = apps.get_model("avg_calc", "MonthlyWorkRollup")
+    rows = (
+        WorkTimeEntry.objects.annotate(
+            year=ExtractYear("date"), month=ExtractMonth("date")
+        )
+        .values("user_id", "year", "month")
+        .annotate(
+            total=Sum("total_work_time"),
+            entry_count=Count("id"),
+            half_day_count=Count(
+                "id",
+                filter=Q(
+                    total_work_time__gt=timedelta(),
+                    total_work_time__lt=timedelta(hours=6, minutes=30),
+                ),
+            ),
+            total_break=Sum(F("breakin_time") - F("breakout_time")),
+        )
+        .order_by()
+    )
+    MonthlyWorkRollup.objects.bulk_create(
+        (
+            MonthlyWorkRollup(
+                user_id=row["user_id"],
+                year=row["year"],
+                month=row["month"],
+                total_seconds=int(row["total"].total_seconds()) if row["total"] else 0,
+                entry_count=row["entry_count"],
+                half_day_count=row["half_day_count"],
+                total_break_seconds=(
+                    int(row["total_break"].total_seconds()) if row["total_break"] else 0
+                ),
+            )
+            for row in rows
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("avg_calc", "0012_timelogimport_dry_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyWorkRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("total_seconds", models.BigIntegerField(default=0)),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("half_day_count", models.PositiveIntegerField(default=0)),
+                ("total_break_seconds", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyworkrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "year", "month"), name="unique_rollup_user_month"
+            ),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0013_monthlyworkrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrgCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=32, unique=True)),
+                (
+                    "value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:50
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0015_holiday"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="leave",
+            index=django.contrib.postgres.indexes.GistIndex(
+                models.Func(
+                    models.F("start_date"),
+                    models.F("end_date"),
+                    models.Value("[]"),
+                    function="daterange",
+                    output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+                ),
+                name="leave_period_gist",
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_activity_counts(apps, schema_editor):
+    RecentActivity = apps.get_model("avg_calc", "RecentActivity")
+    DailyActivityCount = apps.get_model("avg_calc", "DailyActivityCount")
+    rows = (
+        RecentActivity.objects.annotate(day=TruncDate("timestamp"))
+        .values("user_id", "day")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    DailyActivityCount.objects.bulk_create(
+        (
+            DailyActivityCount(
+                user_id=row["user_id"], date=row["day"], count=row["count"]
+            )
+            for row in rows
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("avg_calc", "0016_leave_period_gist_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyActivityCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="dailyactivitycount",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="unique_activity_count_user_date"
+            ),
+        ),
+        migrations.RunPython(backfill_activity_counts, migrations.RunPython.noop),
+    ]
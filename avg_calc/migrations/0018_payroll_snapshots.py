@@ -0,0 +1,124 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("avg_calc", "0017_dailyactivitycount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PayrollPeriod",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("closed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "lunch_per_day",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                ("headcount", models.PositiveIntegerField(default=0)),
+                (
+                    "total_salary",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_pf",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_payment",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_lunch",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "closed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PayrollSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("username", models.CharField(max_length=150)),
+                ("salary", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("present_days", models.PositiveIntegerField(default=0)),
+                ("pf", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("payment", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("lunch", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "period",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshots",
+                        to="avg_calc.payrollperiod",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["period", "username"], name="payroll_snapshot_order"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="payrollsnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("period", "user"), name="unique_payroll_snapshot_user"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="payrollperiod",
+            constraint=models.UniqueConstraint(
+                fields=("year", "month"), name="unique_payroll_period_month"
+            ),
+        ),
+    ]
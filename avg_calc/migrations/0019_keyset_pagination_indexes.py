@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0018_payroll_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recentactivity",
+            index=models.Index(
+                fields=["user", "-timestamp", "-id"], name="activity_user_seek"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="worktimeentry",
+            index=models.Index(fields=["date", "id"], name="worktimeentry_date_seek"),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0019_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=255, unique=True)),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+        # Bumps draw versions from a sequence, which never hands out a value
+        # twice, not even after the bumping transaction rolled back.
+        migrations.RunSQL(
+            "CREATE SEQUENCE avg_calc_cacheversion_version_seq",
+            "DROP SEQUENCE avg_calc_cacheversion_version_seq",
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0020_cacheversion"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dailyactivitycount",
+            index=models.Index(fields=["date"], name="activity_count_date"),
+        ),
+    ]
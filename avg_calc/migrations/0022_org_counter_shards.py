@@ -0,0 +1,29 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avg_calc", "0021_activity_count_date_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orgcounter",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="orgcounter",
+            name="name",
+            field=models.CharField(max_length=32),
+        ),
+        migrations.AddConstraint(
+            model_name="orgcounter",
+            constraint=models.UniqueConstraint(
+                fields=("name", "shard"), name="unique_org_counter_shard"
+            ),
+        ),
+    ]
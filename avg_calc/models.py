@@ -1,7 +1,10 @@
 from datetime import datetime
 
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from django.db.models import F, Func, Value
 
 
 class WorkTimeEntry(models.Model):
@@ -13,6 +16,16 @@ class WorkTimeEntry(models.Model):
     breakin_time = models.TimeField()
     total_work_time = models.DurationField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date"], name="unique_worktimeentry_user_date"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date", "id"], name="worktimeentry_date_seek"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.date}"
 
@@ -30,6 +43,61 @@ class WorkTimeEntry(models.Model):
         super().save(*args, **kwargs)
 
 
+class MonthlyWorkRollup(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    total_seconds = models.BigIntegerField(default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    half_day_count = models.PositiveIntegerField(default=0)
+    total_break_seconds = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "year", "month"], name="unique_rollup_user_month"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.month}/{self.year}"
+
+
+class Holiday(models.Model):
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=255)
+
+    def __str__(self):
+        return f"{self.name} - {self.date}"
+
+
+class OrgCounter(models.Model):
+    name = models.CharField(max_length=32)
+    # Shard 0 holds the reconciled total, the others collect write deltas
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "shard"], name="unique_org_counter_shard"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}[{self.shard}] = {self.value}"
+
+
+class CacheVersion(models.Model):
+    key = models.CharField(max_length=255, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} @ {self.version}"
+
+
 class DailyWorkSummary(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
@@ -48,6 +116,59 @@ class SalaryExpenses(models.Model):
         return self.user.username
 
 
+class PayrollPeriod(models.Model):
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    closed_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    closed_at = models.DateTimeField(auto_now_add=True)
+    lunch_per_day = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    headcount = models.PositiveIntegerField(default=0)
+    total_salary = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_pf = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_payment = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_lunch = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month"], name="unique_payroll_period_month"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Payroll {self.month}/{self.year}"
+
+
+class PayrollSnapshot(models.Model):
+    period = models.ForeignKey(
+        PayrollPeriod, on_delete=models.CASCADE, related_name="snapshots"
+    )
+    user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
+    username = models.CharField(max_length=150)
+    salary = models.DecimalField(max_digits=14, decimal_places=2)
+    present_days = models.PositiveIntegerField(default=0)
+    pf = models.DecimalField(max_digits=14, decimal_places=2)
+    payment = models.DecimalField(max_digits=14, decimal_places=2)
+    lunch = models.DecimalField(max_digits=14, decimal_places=2)
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "user"], name="unique_payroll_snapshot_user"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["period", "username"], name="payroll_snapshot_order"),
+        ]
+
+    def __str__(self):
+        return f"{self.username} - {self.period}"
+
+
 class Leave(models.Model):
     STATUS_CHOICES = [
         ("Pending", "Pending"),
@@ -61,6 +182,20 @@ class Leave(models.Model):
     reason = models.CharField(max_length=255)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
 
+    class Meta:
+        indexes = [
+            GistIndex(
+                Func(
+                    F("start_date"),
+                    F("end_date"),
+                    Value("[]"),
+                    function="daterange",
+                    output_field=DateRangeField(),
+                ),
+                name="leave_period_gist",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.start_date} to {self.end_date}"
 
@@ -88,5 +223,65 @@ class RecentActivity(models.Model):
     description = models.CharField(max_length=255)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-timestamp", "-id"], name="activity_user_seek"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.description}"
+
+
+class DailyActivityCount(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date"], name="unique_activity_count_user_date"
+            ),
+        ]
+        indexes = [models.Index(fields=["date"], name="activity_count_date")]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}: {self.count}"
+
+
+class TimelogImport(models.Model):
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    MODE_CHOICES = [
+        ("upsert", "Add new days and update changed ones"),
+        ("insert", "Add new days only"),
+        ("dry_run", "Preview changes without saving"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    file = models.FileField(upload_to="imports/", blank=True)
+    file_name = models.CharField(max_length=255)
+    checksum = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default="upsert")
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_committed = models.PositiveIntegerField(default=0)
+    rows_imported = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    changes = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.file_name} ({self.status})"
@@ -0,0 +1,313 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import Counter
+
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from openpyxl import load_workbook
+
+from avg_calc.imports import (
+    DATE_FORMAT,
+    DELIMITED_EXTENSIONS,
+    USERNAME_COLUMN,
+    ImportResult,
+    diff_entries,
+    get_batch_size,
+    get_delimiter,
+    missing_columns,
+    prepare_time_logs,
+    read_csv_time_logs,
+    read_header,
+    record_import,
+    sheet_header,
+    write_entries,
+)
+from avg_calc.methods import log_activity
+from avg_calc.pools import process_pool
+
+
+def get_worker_count(workers=None):
+    return (
+        workers or getattr(settings, "TIMELOG_IMPORT_WORKERS", None) or os.cpu_count()
+    )
+
+
+def get_part_bytes(part_bytes=None):
+    return part_bytes or getattr(settings, "TIMELOG_IMPORT_PART_BYTES", 4 * 1024 * 1024)
+
+
+def _split_by_username(data, source, first_row):
+    frame, rejected = prepare_time_logs(data, first_row)
+    for record in rejected:
+        record["Source"] = source
+    # Sheet row of every valid row, to report repeats across parts of a file
+    rejected_rows = {record["row"] for record in rejected}
+    frame["row"] = [row for row in first_row + data.index if row not in rejected_rows]
+    frame["source"] = source
+    if "username" not in frame.columns:
+        return {source: frame}, rejected
+    frames = {
+        username: rows.drop(columns="username")
+        for username, rows in frame.groupby("username")
+    }
+    return frames, rejected
+
+
+def parse_part(path, source, sheet_name=None, start=None, stop=None, first_row=2):
+    """
+    Parses one part of an organization upload in a worker process.
+
+    A part is a sheet of a workbook, the first sheet of a workbook in a zip
+    archive, or the lines between the byte offsets ``start`` and ``stop`` of a
+    delimited file, whose first line is sheet row ``first_row``. Rows belong
+    to the ``Username`` column when there is one, otherwise to the user named
+    by ``source``.
+
+    Returns:
+        tuple: Valid rows keyed by username, and the rejected rows.
+    """
+    if start is None:
+        data = pd.read_excel(path, sheet_name=sheet_name or 0)
+        return _split_by_username(data.dropna(how="all"), source, first_row)
+
+    with open(path, "rb") as upload:
+        delimiter = get_delimiter(upload)
+        header = upload.readline()
+        upload.seek(start)
+        content = upload.read() if stop is None else upload.read(stop - start)
+    # Blank lines are kept while reading so the index counts file lines
+    data = read_csv_time_logs(
+        io.BytesIO(header + content),
+        delimiter,
+        extra_columns=[USERNAME_COLUMN],
+        skip_blank_lines=False,
+    )
+    return _split_by_username(data.dropna(how="all"), source, first_row)
+
+
+def _source(name):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def _byte_ranges(path, workers):
+    """
+    Cuts the data lines of a delimited file into at most ``workers`` ranges
+    of at least ``TIMELOG_IMPORT_PART_BYTES``, each ending on a line break,
+    so every worker reads only its own range.
+
+    Returns:
+        list: ``(start, stop, first_row)`` per range; the last one is
+        open-ended.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as upload:
+        upload.readline()
+        starts = [upload.tell()]
+        pieces = max(min(workers, (size - starts[0]) // get_part_bytes()), 1)
+        step = (size - starts[0]) // pieces
+        for piece in range(1, pieces):
+            upload.seek(starts[0] + piece * step)
+            upload.readline()
+            if starts[-1] < upload.tell() < size:
+                starts.append(upload.tell())
+
+        # Sheet row of each range's first line: the header is row 1
+        first_rows, row = [], 2
+        upload.seek(starts[0])
+        for start, stop in zip(starts, starts[1:]):
+            first_rows.append(row)
+            row += upload.read(stop - start).count(b"\n")
+        first_rows.append(row)
+    stops = starts[1:] + [None]
+    return list(zip(starts, stops, first_rows))
+
+
+def _save_units(uploaded_file, workdir):
+    """
+    Writes the parseable units of an upload to ``workdir``: every supported
+    file of a zip archive, or the upload itself.
+
+    Returns:
+        list: ``(path, source)`` per unit. ``source`` is None for a workbook
+        upload, whose sheets are named by their titles.
+    """
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    if extension != ".zip":
+        path = os.path.join(workdir, f"upload{extension}")
+        with open(path, "wb") as unit:
+            for chunk in uploaded_file.chunks():
+                unit.write(chunk)
+        uploaded_file.seek(0)
+        is_delimited = extension in DELIMITED_EXTENSIONS
+        return [(path, _source(uploaded_file.name) if is_delimited else None)]
+
+    units = []
+    with zipfile.ZipFile(uploaded_file) as archive:
+        for index, member in enumerate(archive.namelist()):
+            member_extension = os.path.splitext(member)[1].lower()
+            if member_extension not in {".xlsx", *DELIMITED_EXTENSIONS}:
+                continue
+            if os.path.basename(member).startswith("."):
+                continue
+            path = os.path.join(workdir, f"{index}{member_extension}")
+            with archive.open(member) as source, open(path, "wb") as unit:
+                shutil.copyfileobj(source, unit)
+            units.append((path, _source(member)))
+    uploaded_file.seek(0)
+    return units
+
+
+def _rejected_unit(source, columns):
+    return {
+        "row": 1,
+        "error": f"Missing columns: {', '.join(missing_columns(columns))}",
+        "Source": source,
+    }
+
+
+def split_upload(uploaded_file, workdir, workers=1):
+    """
+    Saves an organization upload to ``workdir`` and splits it into
+    independently parseable parts: every sheet of a workbook, the first sheet
+    of every workbook in a zip archive, and byte ranges of every delimited
+    file, so a single large CSV is parsed by ``workers`` processes too. Parts
+    carry a path, so workers read only their own part from disk.
+
+    Every workbook is opened once to read its sheets' headers. Units whose
+    header lacks the template columns, such as a summary sheet, are skipped
+    and reported as rejected.
+
+    Returns:
+        tuple: ``parse_part`` arguments for every part, and the rejected units.
+    """
+    parts, rejected = [], []
+    for path, source in _save_units(uploaded_file, workdir):
+        if os.path.splitext(path)[1] in DELIMITED_EXTENSIONS:
+            with open(path, "rb") as unit:
+                columns = read_header(unit)
+            if missing_columns(columns):
+                rejected.append(_rejected_unit(source, columns))
+                continue
+            parts += [
+                (path, source, None, start, stop, first_row)
+                for start, stop, first_row in _byte_ranges(path, workers)
+            ]
+            continue
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheets = [(sheet.title, sheet) for sheet in workbook.worksheets]
+            if source is not None:
+                sheets = [(source, workbook.worksheets[0])]
+            for name, sheet in sheets:
+                columns = sheet_header(sheet)
+                if missing_columns(columns):
+                    rejected.append(_rejected_unit(name, columns))
+                else:
+                    parts.append((path, name, sheet.title))
+        finally:
+            workbook.close()
+    return parts, rejected
+
+
+def _reject_repeats(frame, username):
+    """
+    Rejects days that one sheet or file repeats across two of its row ranges.
+    Repeats within a range were already rejected by ``prepare_time_logs``.
+
+    Returns:
+        tuple: The rows to import, and the rejected repeats.
+    """
+    repeated = frame.duplicated(["source", "date"], keep=False)
+    rejected = [
+        {
+            "row": int(row),
+            "error": "Duplicate date in file",
+            "Source": source,
+            USERNAME_COLUMN: username,
+            "Date": day.strftime(DATE_FORMAT),
+        }
+        for row, source, day in zip(
+            frame["row"][repeated], frame["source"][repeated], frame["date"][repeated]
+        )
+    ]
+    return frame[~repeated].drop(columns=["row", "source"]), rejected
+
+
+def import_org_time_logs(user, uploaded_file, mode="upsert", workers=None):
+    """
+    Imports timelogs for many users from one upload.
+
+    Parts are parsed in parallel across a process pool, usernames are resolved
+    to ids with a single query and every user's rows are written with the same
+    batched upsert as personal imports, all in one transaction. A ``dry_run``
+    compares every user's rows against stored timelogs in one query instead.
+
+    Returns:
+        tuple: The ``ImportResult`` and the list of unknown usernames.
+    """
+    started = time.perf_counter()
+    workers = get_worker_count(workers)
+    with tempfile.TemporaryDirectory() as workdir:
+        parts, rejected = split_upload(uploaded_file, workdir, workers)
+        workers = min(workers, max(len(parts), 1))
+        if workers > 1:
+            with process_pool(workers) as executor:
+                parsed = list(executor.map(parse_part, *zip(*parts)))
+        else:
+            parsed = [parse_part(*part) for part in parts]
+
+    frames = {}
+    for part_frames, part_rejected in parsed:
+        rejected.extend(part_rejected)
+        for username, frame in part_frames.items():
+            frames.setdefault(username, []).append(frame)
+    for username, user_frames in frames.items():
+        frames[username], repeats = _reject_repeats(pd.concat(user_frames), username)
+        rejected.extend(repeats)
+
+    user_ids = dict(
+        User.objects.filter(username__in=frames).values_list("username", "id")
+    )
+    unknown_users = sorted(set(frames) - set(user_ids))
+
+    batch_size = get_batch_size()
+    counts, changes = Counter(inserted=0, updated=0, unchanged=0), []
+    with transaction.atomic():
+        if mode == "dry_run":
+            if user_ids:
+                counts, changes = diff_entries(
+                    pd.concat(
+                        frames[username].assign(user_id=user_id)
+                        for username, user_id in user_ids.items()
+                    )
+                )
+            usernames = {user_id: username for username, user_id in user_ids.items()}
+            for change in changes:
+                change["username"] = usernames[change["user_id"]]
+        else:
+            for username, user_id in user_ids.items():
+                counts.update(
+                    write_entries(user_id, frames[username], batch_size, mode)
+                )
+            log_activity(
+                user,
+                f"Upload Organization Work Time ({counts.total()} rows, "
+                f"{len(user_ids)} users)",
+            )
+        job = record_import(user, uploaded_file, mode, counts, rejected, changes)
+
+    result = ImportResult(
+        rows=counts.total(),
+        seconds=time.perf_counter() - started,
+        failed=len(rejected),
+        job_id=job.pk,
+        **counts,
+    )
+    return result, unknown_users
@@ -0,0 +1,210 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+CURSOR_PARAM = "cursor"
+
+
+def get_count_cache_timeout():
+    return getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 60)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+        return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values, backwards=False):
+    payload = {"v": [_encode_value(value) for value in values]}
+    if backwards:
+        payload["b"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: The key values and whether the cursor points backwards, or
+        None for a missing or malformed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return [_decode_value(value) for value in payload["v"]], bool(payload.get("b"))
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, params, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.params = params
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _url(self, cursor):
+        params = self.params.copy()
+        params[CURSOR_PARAM] = cursor
+        return f"?{params.urlencode()}"
+
+    @property
+    def next_url(self):
+        if not self.has_next:
+            return None
+        return self._url(encode_cursor(self.paginator.key(self.object_list[-1])))
+
+    @property
+    def previous_url(self):
+        if not self.has_previous:
+            return None
+        return self._url(
+            encode_cursor(self.paginator.key(self.object_list[0]), backwards=True)
+        )
+
+    @property
+    def first_url(self):
+        params = self.params.copy()
+        params.pop(CURSOR_PARAM, None)
+        return f"?{params.urlencode()}"
+
+    @property
+    def count(self):
+        return self.paginator.count
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over a queryset ordered by ``ordering``, a tuple of fields
+    that ends with a unique one, e.g. ``("date", "id")`` or
+    ``("-timestamp", "-id")``.
+
+    Each page is fetched with a ``WHERE (keys) > (last seen keys)`` condition
+    instead of an ``OFFSET``, so every page costs the same. Pages link to each
+    other through opaque cursors. The total count is only computed when asked
+    for and is cached under ``count_key`` when one is given.
+    """
+
+    def __init__(self, queryset, ordering, per_page=10, count_key=None):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip("-") for field in self.ordering]
+        self.per_page = per_page
+        self.count_key = count_key
+
+    def key(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def _field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        model = self.queryset.model
+        *relations, name = name.split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def _coerce(self, values):
+        """
+        Converts cursor values with the model field of each ordering key.
+
+        Returns:
+            list: The converted values, or None when one of them does not fit
+            its field, so a tampered cursor falls back to the first page
+            instead of failing the query.
+        """
+        try:
+            values = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            return None
+        return None if None in values else values
+
+    def _after(self, values, backwards):
+        # (a, b) > (x, y) expanded to a > x OR (a = x AND b > y), per direction
+        condition = Q()
+        for position, ordering in enumerate(self.ordering):
+            descending = ordering.startswith("-") != backwards
+            lookup = "lt" if descending else "gt"
+            step = Q(**{f"{self.fields[position]}__{lookup}": values[position]})
+            for field, value in zip(self.fields[:position], values):
+                step &= Q(**{field: value})
+            condition |= step
+        return condition
+
+    def get_page(self, params):
+        """
+        Returns the page selected by the ``cursor`` query parameter, or the
+        first page when it is missing or invalid. Other parameters are kept in
+        the page links.
+
+        Returns:
+            KeysetPage: The rows of the page and links to its neighbours.
+        """
+        cursor = decode_cursor(params.get(CURSOR_PARAM) or "")
+        values = None
+        if cursor is not None and len(cursor[0]) == len(self.fields):
+            values = self._coerce(cursor[0])
+        if values is None:
+            rows = list(self.queryset.order_by(*self.ordering)[: self.per_page + 1])
+            return KeysetPage(
+                rows[: self.per_page], self, params, len(rows) > self.per_page, False
+            )
+
+        backwards = cursor[1]
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+        rows = list(
+            self.queryset.filter(self._after(values, backwards)).order_by(*ordering)[
+                : self.per_page + 1
+            ]
+        )
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+            return KeysetPage(rows, self, params, bool(rows), more)
+        return KeysetPage(rows, self, params, more, bool(rows))
+
+    @property
+    def count(self):
+        if self.count_key is None:
+            return self.queryset.count()
+        return cache.get_or_set(
+            self.count_key, self.queryset.count, get_count_cache_timeout()
+        )
@@ -0,0 +1,199 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from avg_calc.models import (
+    MonthlyWorkRollup,
+    PayrollPeriod,
+    PayrollSnapshot,
+    SalaryExpenses,
+)
+from avg_calc.work_calendar import month_bounds, working_day_counts
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+# Per-user payroll figures, shared by live rows and snapshots
+ROW_FIELDS = ["salary", "present_days", "pf", "payment", "lunch", "balance"]
+TOTAL_FIELDS = ["salary", "pf", "payment", "lunch", "balance"]
+
+
+def get_payroll_rules():
+    """
+    Returns the monthly deduction rules as exact decimals.
+
+    Returns:
+        dict: ``pf``, the flat provident fund deduction, and ``lunch_per_day``,
+        charged for every day with a timelog.
+    """
+    return {
+        "pf": Decimal(str(getattr(settings, "PAYROLL_PF_DEDUCTION", "200.00"))),
+        "lunch_per_day": Decimal(
+            str(getattr(settings, "PAYROLL_LUNCH_PER_DAY", "50.00"))
+        ),
+    }
+
+
+def payroll_rows(year, month, users=None, rules=None):
+    """
+    Builds the payroll of one month as a single queryset over
+    ``SalaryExpenses``, with the present days read from the month's rollup and
+    every amount computed by the database in ``numeric``.
+
+    Returns:
+        QuerySet: One dict per salaried user with ``user_id``, ``username``,
+        ``salary``, ``present_days``, ``pf``, ``payment``, ``lunch`` and
+        ``balance``, ordered by username.
+    """
+    rules = rules or get_payroll_rules()
+    present_days = MonthlyWorkRollup.objects.filter(
+        user=OuterRef("user"), year=year, month=month
+    ).values("entry_count")
+
+    if users is None:
+        # Superusers are left out of the organization payroll only
+        rows = SalaryExpenses.objects.filter(user__is_superuser=False)
+    else:
+        rows = SalaryExpenses.objects.filter(user__in=users)
+    return (
+        rows.annotate(
+            username=F("user__username"),
+            present_days=Coalesce(
+                Subquery(present_days), 0, output_field=IntegerField()
+            ),
+            pf=Value(rules["pf"], output_field=MONEY),
+            payment=F("salary") - F("pf"),
+            lunch=F("present_days") * Value(rules["lunch_per_day"], output_field=MONEY),
+            balance=F("payment") - F("lunch"),
+        )
+        .values("user_id", "username", *ROW_FIELDS)
+        .order_by("username", "user_id")
+    )
+
+
+def add_working_days(rows, year, month):
+    """
+    Adds ``working_days``, the month's working days left to each user after
+    their leaves, to payroll rows. The users' leaves are read with one query
+    and checked for every (user, day) pair at once.
+
+    Returns:
+        list: The rows, each with ``working_days`` set, or None for rows of
+        deleted users.
+    """
+    rows = list(rows)
+    counts = working_day_counts(
+        {row["user_id"] for row in rows if row["user_id"]}, *month_bounds(year, month)
+    )
+    for row in rows:
+        row["working_days"] = counts.get(row["user_id"])
+    return rows
+
+
+def payroll_totals(rows):
+    """
+    Sums a payroll queryset from ``payroll_rows`` in one query.
+
+    Returns:
+        dict: ``headcount`` plus ``total_salary``, ``total_pf``,
+        ``total_payment``, ``total_lunch`` and ``total_balance``, zero when
+        nobody is on the payroll.
+    """
+    return rows.order_by().aggregate(
+        headcount=Count("pk"),
+        **{
+            f"total_{field}": Coalesce(
+                Sum(field), Value(Decimal("0.00")), output_field=MONEY
+            )
+            for field in TOTAL_FIELDS
+        },
+    )
+
+
+def close_month(year, month, closed_by=None, batch_size=1000):
+    """
+    Freezes the payroll of a month into ``PayrollSnapshot`` rows, with the
+    organization totals stored on the ``PayrollPeriod``.
+
+    Returns:
+        PayrollPeriod: The closed period, or None if it was already closed.
+    """
+    rules = get_payroll_rules()
+    rows = payroll_rows(year, month, rules=rules)
+    try:
+        with transaction.atomic():
+            period = PayrollPeriod.objects.create(
+                year=year,
+                month=month,
+                closed_by=closed_by,
+                lunch_per_day=rules["lunch_per_day"],
+                **payroll_totals(rows),
+            )
+            PayrollSnapshot.objects.bulk_create(
+                (PayrollSnapshot(period=period, **row) for row in rows.iterator()),
+                batch_size=batch_size,
+            )
+    except IntegrityError:
+        return None
+    return period
+
+
+def reopen_month(year, month):
+    """
+    Drops the snapshot of a closed month so its payroll is computed from live
+    data again.
+
+    Returns:
+        bool: Whether the month was closed.
+    """
+    deleted, _ = PayrollPeriod.objects.filter(year=year, month=month).delete()
+    return bool(deleted)
+
+
+def get_payroll(year, month, user=None):
+    """
+    Returns the payroll of a month for the organization or one user. Closed
+    months are read from their snapshot, open months are computed live.
+    Superusers are never part of a snapshot, so theirs is always live.
+
+    Returns:
+        tuple: The period (None while the month is open), the per-user rows
+        and the totals, both shaped like ``payroll_rows`` and
+        ``payroll_totals``.
+    """
+    period = PayrollPeriod.objects.filter(year=year, month=month).first()
+    if period is None or (user is not None and user.is_superuser):
+        rows = payroll_rows(year, month, users=[user] if user else None)
+        return None, rows, payroll_totals(rows)
+
+    rows = period.snapshots.values("user_id", "username", *ROW_FIELDS).order_by(
+        "username", "user_id"
+    )
+    if user is None:
+        totals = {"headcount": period.headcount}
+        totals.update(
+            {
+                f"total_{field}": getattr(period, f"total_{field}")
+                for field in TOTAL_FIELDS
+            }
+        )
+        return period, rows, totals
+
+    rows = rows.filter(user=user)
+    row = rows.first()
+    totals = {"headcount": 1 if row else 0}
+    totals.update(
+        {f"total_{field}": row[field] if row else 0 for field in TOTAL_FIELDS}
+    )
+    return period, rows, totals
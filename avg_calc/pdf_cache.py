@@ -0,0 +1,164 @@
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.template.loader import get_template
+
+from avg_calc.models import MonthlyWorkRollup
+
+WORKLOG_TEMPLATE = "worktime/worklog_pdf.html"
+WORKLOG_RANGE_TEMPLATE = "worktime/worklog_range_pdf.html"
+
+
+def get_cache_dir():
+    return getattr(
+        settings,
+        "WORKLOG_PDF_CACHE_DIR",
+        os.path.join(settings.BASE_DIR, "cache", "worklog_pdfs"),
+    )
+
+
+def get_pdf_engine():
+    return getattr(settings, "WORKLOG_PDF_ENGINE", "xhtml2pdf")
+
+
+def get_max_bytes():
+    return getattr(settings, "WORKLOG_PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name=WORKLOG_TEMPLATE):
+    """
+    Returns a hash of the template source, so editing the template
+    invalidates every PDF rendered from it after a restart.
+    """
+    with open(get_template(template_name).origin.name, "rb") as source:
+        return hashlib.sha256(source.read()).hexdigest()[:16]
+
+
+def worklog_pdf_key(user, year, month, rollup):
+    """
+    Hashes everything a worklog PDF depends on, including the rendering
+    engine. The month's rollup is refreshed whenever one of its timelogs
+    changes, so its ``updated_at`` versions the rows.
+
+    Returns:
+        str: A hex digest used as the file name and ``ETag``.
+    """
+    data_version = rollup.updated_at.isoformat() if rollup.updated_at else "empty"
+    parts = [
+        user.pk,
+        user.username,
+        user.get_full_name(),
+        year,
+        month,
+        data_version,
+        get_pdf_engine(),
+        template_version(),
+    ]
+    return _digest(parts)
+
+
+def worklog_range_pdf_key(user, start_date, end_date):
+    """
+    Hashes everything a date-range worklog PDF depends on. The rollups of the
+    months it spans version the rows: any timelog change refreshes one of
+    them, and a month losing all its timelogs drops out of the count.
+
+    Returns:
+        str: A hex digest used as the file name and ``ETag``.
+    """
+    versions = (
+        MonthlyWorkRollup.objects.filter(user=user)
+        .alias(period=F("year") * 12 + F("month"))
+        .filter(
+            period__range=(
+                start_date.year * 12 + start_date.month,
+                end_date.year * 12 + end_date.month,
+            )
+        )
+        .aggregate(count=Count("pk"), latest=Max("updated_at"))
+    )
+    parts = [
+        user.pk,
+        user.username,
+        user.get_full_name(),
+        start_date,
+        end_date,
+        versions["count"],
+        versions["latest"].isoformat() if versions["latest"] else "empty",
+        get_pdf_engine(),
+        template_version(WORKLOG_RANGE_TEMPLATE),
+    ]
+    return _digest(parts)
+
+
+def _digest(parts):
+    return hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def _path(key):
+    return os.path.join(get_cache_dir(), f"{key}.pdf")
+
+
+def cached_pdf(key):
+    """
+    Returns:
+        str: The path of the cached PDF, or None on a miss. Hits are touched so
+        eviction drops the least recently used files first.
+    """
+    path = _path(key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store_pdf(key, content):
+    """
+    Writes a rendered PDF atomically and evicts old files if the cache grew
+    past ``WORKLOG_PDF_CACHE_MAX_BYTES``.
+
+    Returns:
+        str: The path of the cached PDF.
+    """
+    cache_dir = get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+        f.write(content)
+    os.replace(f.name, _path(key))
+    evict(get_max_bytes())
+    return _path(key)
+
+
+def evict(max_bytes):
+    """
+    Deletes the least recently used PDFs until the cache fits in
+    ``max_bytes``.
+
+    Returns:
+        int: The number of files deleted.
+    """
+    entries = []
+    with os.scandir(get_cache_dir()) as files:
+        for entry in files:
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+    return deleted
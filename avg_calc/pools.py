@@ -0,0 +1,31 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+
+def get_start_method():
+    return getattr(settings, "WORKER_START_METHOD", "spawn")
+
+
+def _setup_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def process_pool(workers):
+    """
+    Returns a process pool whose workers are started with
+    ``WORKER_START_METHOD`` instead of forking the threaded server process,
+    and set up Django before running any task. This module imports no models,
+    so a fresh worker can unpickle the initializer before the app registry
+    is ready.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(get_start_method()),
+        initializer=_setup_worker,
+        initargs=(settings.SETTINGS_MODULE,),
+    )
@@ -0,0 +1,521 @@
+import html
+import io
+import os
+import zipfile
+from calendar import monthrange
+from concurrent.futures import as_completed
+from datetime import date, timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.functions import TruncMonth
+from django.template.loader import get_template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from pypdf import PdfWriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from xhtml2pdf import pisa
+
+from avg_calc.exports import get_export_chunk_size
+from avg_calc.models import MonthlyWorkRollup, WorkTimeEntry
+from avg_calc.pdf_cache import (
+    WORKLOG_RANGE_TEMPLATE,
+    WORKLOG_TEMPLATE,
+    cached_pdf,
+    get_pdf_engine,
+    store_pdf,
+    worklog_pdf_key,
+)
+from avg_calc.pools import process_pool
+from avg_calc.rollups import rollup_aggregates
+from avg_calc.templatetags.custom_filter import hours_minutes
+
+REPORT_FIELDS = [
+    "date",
+    "login_time",
+    "logout_time",
+    "breakout_time",
+    "breakin_time",
+    "total_work_time",
+]
+WORKLOG_HEADERS = [
+    "Date",
+    "Login",
+    "Logout",
+    "Break-Out",
+    "Break-In",
+    "Total-Work-Time",
+]
+SUMMARY_FIELDS = [
+    "total_seconds",
+    "total_break_seconds",
+    "entry_count",
+    "half_day_count",
+]
+
+
+def get_chunk_rows(chunk_rows=None):
+    return chunk_rows or getattr(settings, "WORKLOG_PDF_CHUNK_ROWS", 500)
+
+
+def get_worker_count(workers=None):
+    return workers or getattr(settings, "WORKLOG_PDF_WORKERS", None) or os.cpu_count()
+
+
+def format_clock(value):
+    # Clock times are naive TimeField values and are printed as stored
+    return "" if value is None else str(value)
+
+
+def month_range(year, month):
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def worklog_summary(rollup):
+    return {field: getattr(rollup, field) for field in SUMMARY_FIELDS}
+
+
+def format_worklog_rows(rows):
+    """
+    Formats report rows in one pass.
+
+    Returns:
+        list: One list of strings per row, in ``WORKLOG_HEADERS`` order.
+    """
+    return [
+        [
+            day.isoformat(),
+            format_clock(login),
+            format_clock(logout),
+            format_clock(breakout),
+            format_clock(breakin),
+            str(total_work or ""),
+        ]
+        for day, login, logout, breakout, breakin, total_work in rows
+    ]
+
+
+def worklog_table_html(rows):
+    """
+    Renders formatted rows as the worklog's HTML table, in the markup pandas'
+    ``to_html`` produced for the template's ``styled-table`` CSS.
+    """
+    header = "".join(f"<th>{html.escape(title)}</th>" for title in WORKLOG_HEADERS)
+    body = "\n".join(
+        "<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>"
+        for row in rows
+    )
+    return mark_safe(
+        '<table border="1" class="dataframe styled-table">'
+        f'<thead><tr style="text-align: right;">{header}</tr></thead>'
+        f"<tbody>{body}</tbody></table>"
+    )
+
+
+def summary_times(summary):
+    """
+    Returns:
+        dict: The month's total, lunch and average work time as timedeltas.
+    """
+    total_work_time = timedelta(seconds=summary["total_seconds"])
+    present_days = summary["entry_count"]
+    return {
+        "total_work_time": total_work_time,
+        "total_lunch_time": timedelta(seconds=summary["total_break_seconds"]),
+        "average_work_time": (
+            total_work_time / present_days if present_days > 0 else timedelta()
+        ),
+    }
+
+
+def render_worklog_pdf(user, year, month, rows, summary):
+    """
+    Renders one user's monthly worklog with the engine chosen by
+    ``WORKLOG_PDF_ENGINE``. Takes plain data only, so it can run in a worker
+    process without database access.
+
+    ``rows`` are ``REPORT_FIELDS`` tuples in date order and ``summary`` the
+    ``SUMMARY_FIELDS`` of the month's rollup.
+
+    Returns:
+        bytes: The PDF, or None if rendering failed.
+    """
+    return PDF_ENGINES[get_pdf_engine()](user, year, month, rows, summary)
+
+
+def render_xhtml2pdf(user, year, month, rows, summary):
+    table_html = worklog_table_html(format_worklog_rows(rows))
+
+    template = get_template(WORKLOG_TEMPLATE)
+    html = template.render(
+        {
+            "user": user,
+            "month": date(year, month, 1).strftime("%B"),
+            "year": year,
+            "table_html": table_html,
+            "present_days": summary["entry_count"],
+            "half_days": summary["half_day_count"],
+            **summary_times(summary),
+        }
+    )
+
+    output = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=output)
+    if pisa_status.err:
+        return None
+    return output.getvalue()
+
+
+def _grid_style():
+    return TableStyle(
+        [
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ]
+    )
+
+
+def _summary_table(summary):
+    times = summary_times(summary)
+    return Table(
+        [
+            [
+                f"Net Present Days: {summary['entry_count']}",
+                f"Total Work Hrs: {hours_minutes(times['total_work_time'])}",
+            ],
+            [
+                f"Total Lunch Hrs: {hours_minutes(times['total_lunch_time'])}",
+                f"Average Work Hrs: {hours_minutes(times['average_work_time'])}",
+            ],
+            [f"Half Days (< 6h 30m): {summary['half_day_count']}", ""],
+        ],
+        hAlign="LEFT",
+    )
+
+
+def render_reportlab(user, year, month, rows, summary):
+    """
+    Draws the same worklog directly with ReportLab platypus, skipping the
+    DataFrame, HTML and CSS round trip of the xhtml2pdf engine.
+    """
+    styles = getSampleStyleSheet()
+    title = (
+        f"Timelogs for {user.get_full_name()} - "
+        f"{date(year, month, 1).strftime('%B')} {year}"
+    )
+
+    output = io.BytesIO()
+    document = SimpleDocTemplate(output, pagesize=A4, title=title)
+    document.build(
+        [
+            Paragraph(escape(title), styles["Heading2"]),
+            Spacer(1, 12),
+            Table(
+                [WORKLOG_HEADERS, *format_worklog_rows(rows)],
+                repeatRows=1,
+                style=_grid_style(),
+                hAlign="CENTER",
+            ),
+            Spacer(1, 24),
+            Paragraph("Summary Report", styles["Heading3"]),
+            _summary_table(summary),
+        ]
+    )
+    return output.getvalue()
+
+
+def render_sections_xhtml2pdf(title, sections, summary):
+    html = get_template(WORKLOG_RANGE_TEMPLATE).render(
+        {
+            "title": title,
+            "sections": [
+                {
+                    "label": section["label"],
+                    "table_html": worklog_table_html(section["rows"]),
+                    "present_days": section["summary"]["entry_count"],
+                    "half_days": section["summary"]["half_day_count"],
+                    **summary_times(section["summary"]),
+                }
+                for section in sections
+            ],
+            "summary": summary
+            and {
+                "present_days": summary["entry_count"],
+                "half_days": summary["half_day_count"],
+                **summary_times(summary),
+            },
+        }
+    )
+    output = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=output)
+    if pisa_status.err:
+        return None
+    return output.getvalue()
+
+
+def render_sections_reportlab(title, sections, summary):
+    styles = getSampleStyleSheet()
+    story = [Paragraph(escape(title), styles["Heading2"])] if title else []
+    for section in sections:
+        times = summary_times(section["summary"])
+        story += [
+            Paragraph(escape(section["label"]), styles["Heading3"]),
+            Table(
+                [WORKLOG_HEADERS, *section["rows"]],
+                repeatRows=1,
+                style=_grid_style(),
+                hAlign="CENTER",
+            ),
+            Paragraph(
+                f"Present Days: {section['summary']['entry_count']} &nbsp; "
+                f"Work Hrs: {hours_minutes(times['total_work_time'])} &nbsp; "
+                f"Lunch Hrs: {hours_minutes(times['total_lunch_time'])} &nbsp; "
+                f"Half Days: {section['summary']['half_day_count']}",
+                styles["Normal"],
+            ),
+            Spacer(1, 12),
+        ]
+    if summary:
+        story += [
+            Spacer(1, 12),
+            Paragraph("Summary Report", styles["Heading3"]),
+            _summary_table(summary),
+        ]
+
+    output = io.BytesIO()
+    SimpleDocTemplate(output, pagesize=A4).build(story)
+    return output.getvalue()
+
+
+PDF_ENGINES = {
+    "xhtml2pdf": render_xhtml2pdf,
+    "reportlab": render_reportlab,
+}
+SECTION_ENGINES = {
+    "xhtml2pdf": render_sections_xhtml2pdf,
+    "reportlab": render_sections_reportlab,
+}
+
+
+def fetch_worklog_rows(users, start_date, end_date):
+    """
+    Loads the timelogs of many users over a date range with one query, reading
+    only the columns the report shows.
+
+    Returns:
+        dict: ``REPORT_FIELDS`` tuples in date order, keyed by user id.
+    """
+    rows = {}
+    entries = (
+        WorkTimeEntry.objects.filter(user__in=users, date__range=(start_date, end_date))
+        .order_by("user_id", "date")
+        .values_list("user_id", *REPORT_FIELDS)
+    )
+    for user_id, *row in entries:
+        rows.setdefault(user_id, []).append(tuple(row))
+    return rows
+
+
+def _summary(row):
+    return {
+        "total_seconds": int(row["total"].total_seconds()) if row["total"] else 0,
+        "total_break_seconds": (
+            int(row["total_break"].total_seconds()) if row["total_break"] else 0
+        ),
+        "entry_count": row["entry_count"],
+        "half_day_count": row["half_day_count"],
+    }
+
+
+def month_subtotals(user, start_date, end_date):
+    """
+    Computes the summary of every month of a range with one grouped query.
+
+    Returns:
+        dict: ``SUMMARY_FIELDS`` dicts keyed by the first day of each month
+        with timelogs, in date order.
+    """
+    totals = (
+        WorkTimeEntry.objects.filter(user=user, date__range=(start_date, end_date))
+        .annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(**rollup_aggregates())
+        .order_by("month")
+    )
+    return {row["month"]: _summary(row) for row in totals}
+
+
+def iter_month_sections(user, start_date, end_date, subtotals, chunk_size=None):
+    """
+    Scans a user's timelogs over a range once, through a server-side cursor,
+    and yields one section per month: its label, formatted rows and subtotal.
+    """
+    entries = (
+        WorkTimeEntry.objects.filter(user=user, date__range=(start_date, end_date))
+        .order_by("date")
+        .values_list(*REPORT_FIELDS)
+        .iterator(chunk_size=get_export_chunk_size(chunk_size))
+    )
+    for month, rows in groupby(entries, key=lambda row: row[0].replace(day=1)):
+        yield {
+            "label": month.strftime("%B %Y"),
+            "rows": format_worklog_rows(rows),
+            # A month written between the two queries has no subtotal yet
+            "summary": subtotals.get(month) or dict.fromkeys(SUMMARY_FIELDS, 0),
+        }
+
+
+def total_summary(subtotals):
+    return {
+        field: sum(summary[field] for summary in subtotals.values())
+        for field in SUMMARY_FIELDS
+    }
+
+
+def render_worklog_range_pdf(user, start_date, end_date, chunk_rows=None):
+    """
+    Renders one document for any date range, with a section and subtotal per
+    month and a summary of the whole range.
+
+    Months are rendered in chunks of about ``WORKLOG_PDF_CHUNK_ROWS`` rows and
+    the chunks are merged with pypdf, so the renderer never holds more than
+    one chunk no matter how long the range is.
+
+    Returns:
+        bytes: The PDF, or None if rendering failed.
+    """
+    chunk_rows = get_chunk_rows(chunk_rows)
+    subtotals = month_subtotals(user, start_date, end_date)
+    render_sections = SECTION_ENGINES[get_pdf_engine()]
+    title = (
+        f"Timelogs for {user.get_full_name() or user.username} - "
+        f"{start_date.strftime('%d %b %Y')} to {end_date.strftime('%d %b %Y')}"
+    )
+
+    writer = PdfWriter()
+    chunk, rows_in_chunk = [], 0
+
+    def flush(summary=None):
+        content = render_sections(
+            title if not len(writer.pages) else None, chunk, summary
+        )
+        if content is None:
+            return False
+        writer.append(io.BytesIO(content))
+        return True
+
+    for section in iter_month_sections(user, start_date, end_date, subtotals):
+        chunk.append(section)
+        rows_in_chunk += len(section["rows"])
+        if rows_in_chunk >= chunk_rows:
+            if not flush():
+                return None
+            chunk, rows_in_chunk = [], 0
+    if not flush(total_summary(subtotals)):
+        return None
+
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _render_job(key, user, year, month, rows, summary):
+    return key, render_worklog_pdf(user, year, month, rows, summary)
+
+
+def iter_worklog_pdfs(users, year, month, workers=None):
+    """
+    Yields ``(user, pdf)`` for every user's monthly worklog as soon as it is
+    ready. Timelogs and rollups are fetched with one query each, cached PDFs
+    are reused and the rest are rendered across a process pool.
+    """
+    users = list(users)
+    rows = fetch_worklog_rows(users, *month_range(year, month))
+    rollups = {
+        rollup.user_id: rollup
+        for rollup in MonthlyWorkRollup.objects.filter(
+            user__in=users, year=year, month=month
+        )
+    }
+
+    jobs = []
+    for user in users:
+        rollup = rollups.get(user.pk) or MonthlyWorkRollup()
+        key = worklog_pdf_key(user, year, month, rollup)
+        path = cached_pdf(key)
+        if path is not None:
+            with open(path, "rb") as cached:
+                yield user, cached.read()
+            continue
+        # A detached copy pickles without the related caches of the queryset
+        detached = User(
+            pk=user.pk,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+        )
+        jobs.append(
+            (key, detached, year, month, rows.get(user.pk, []), worklog_summary(rollup))
+        )
+
+    users_by_key = {job[0]: job[1] for job in jobs}
+    workers = min(get_worker_count(workers), len(jobs))
+    if workers > 1:
+        with process_pool(workers) as executor:
+            futures = [executor.submit(_render_job, *job) for job in jobs]
+            results = (future.result() for future in as_completed(futures))
+            yield from _store_results(results, users_by_key)
+    else:
+        results = (_render_job(*job) for job in jobs)
+        yield from _store_results(results, users_by_key)
+
+
+def _store_results(results, users_by_key):
+    for key, content in results:
+        if content is not None:
+            store_pdf(key, content)
+        yield users_by_key[key], content
+
+
+class ZipStream:
+    """
+    A write-only, unseekable buffer for ``zipfile``. Whatever was written
+    since the last ``drain`` is handed out, so an archive can be streamed
+    while it is being built.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_worklog_zip(users, year, month, workers=None):
+    """
+    Streams a zip of the users' monthly worklog PDFs, adding each PDF as soon
+    as it has been rendered.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+        for user, content in iter_worklog_pdfs(users, year, month, workers):
+            if content is None:
+                continue
+            archive.writestr(f"timelog_{user.username}_{month}_{year}.pdf", content)
+            yield stream.drain()
+    yield stream.drain()
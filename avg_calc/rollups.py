@@ -0,0 +1,147 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from avg_calc.models import MonthlyWorkRollup, WorkTimeEntry
+
+HALF_DAY = timedelta(hours=6, minutes=30)
+ROLLUP_FIELDS = [
+    "total_seconds",
+    "entry_count",
+    "half_day_count",
+    "total_break_seconds",
+]
+
+
+def month_key(user_id, day):
+    return (user_id, day.year, day.month)
+
+
+def rollup_aggregates():
+    """
+    The aggregates behind ``MonthlyWorkRollup``: total work and break time,
+    entry count and half days.
+    """
+    return {
+        "total": Sum("total_work_time"),
+        "entry_count": Count("id"),
+        "half_day_count": Count(
+            "id",
+            filter=Q(total_work_time__gt=timedelta(), total_work_time__lt=HALF_DAY),
+        ),
+        "total_break": Sum(F("breakin_time") - F("breakout_time")),
+    }
+
+
+def aggregate_months(entries):
+    """
+    Groups timelog entries by user and calendar month with the totals kept on
+    ``MonthlyWorkRollup``.
+    """
+    return (
+        entries.annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("user_id", "year", "month")
+        .annotate(**rollup_aggregates())
+        .order_by()
+    )
+
+
+def _rollup(row):
+    return MonthlyWorkRollup(
+        user_id=row["user_id"],
+        year=row["year"],
+        month=row["month"],
+        total_seconds=int(row["total"].total_seconds()) if row["total"] else 0,
+        entry_count=row["entry_count"],
+        half_day_count=row["half_day_count"],
+        total_break_seconds=(
+            int(row["total_break"].total_seconds()) if row["total_break"] else 0
+        ),
+    )
+
+
+def lock_months(keys):
+    """
+    Takes a transaction-level advisory lock on every ``(user_id, year, month)``
+    key, in sorted order so concurrent refreshes cannot deadlock. The locks are
+    released when the surrounding transaction ends.
+    """
+    keys = sorted(keys)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(user_id, period) "
+            "FROM unnest(%s::integer[], %s::integer[]) AS month(user_id, period)",
+            [
+                [user_id for user_id, _, _ in keys],
+                [year * 12 + month for _, year, month in keys],
+            ],
+        )
+
+
+def refresh_rollups(keys):
+    """
+    Recomputes the rollups of the given ``(user_id, year, month)`` keys from
+    their entries with one grouped query and one upsert. Months left without
+    entries lose their rollup row.
+
+    The keys are locked before aggregating, so a concurrent refresh of the same
+    month waits and then aggregates rows committed by this one, instead of
+    overwriting it with totals that missed them.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+
+    first = min(date(year, month, 1) for _, year, month in keys)
+    last = max(date(year, month, monthrange(year, month)[1]) for _, year, month in keys)
+
+    with transaction.atomic():
+        lock_months(keys)
+        rollups = [
+            _rollup(row)
+            for row in aggregate_months(
+                WorkTimeEntry.objects.filter(
+                    user_id__in={user_id for user_id, _, _ in keys},
+                    date__range=(first, last),
+                )
+            )
+            if (row["user_id"], row["year"], row["month"]) in keys
+        ]
+        MonthlyWorkRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=["user", "year", "month"],
+            update_fields=[*ROLLUP_FIELDS, "updated_at"],
+        )
+        empty = keys - {(r.user_id, r.year, r.month) for r in rollups}
+        if empty:
+            MonthlyWorkRollup.objects.filter(
+                reduce(
+                    or_,
+                    (
+                        Q(user_id=user_id, year=year, month=month)
+                        for user_id, year, month in empty
+                    ),
+                )
+            ).delete()
+
+
+def rebuild_rollups(batch_size=1000):
+    """
+    Replaces every rollup with totals recomputed from all timelog entries.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    with transaction.atomic():
+        MonthlyWorkRollup.objects.all().delete()
+        rollups = MonthlyWorkRollup.objects.bulk_create(
+            (_rollup(row) for row in aggregate_months(WorkTimeEntry.objects.all())),
+            batch_size=batch_size,
+        )
+    return len(rollups)
@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from avg_calc.activity import count_activity
+from avg_calc.counters import adjust_counter
+from avg_calc.dashboard_cache import bump_all_dashboards, bump_dashboard_versions
+from avg_calc.models import (
+    Holiday,
+    Leave,
+    RecentActivity,
+    SalaryExpenses,
+    Task,
+    WorkTimeEntry,
+)
+from avg_calc.rollups import month_key, refresh_rollups
+from avg_calc.work_calendar import bump_calendar, iter_months
+
+# Sent after a bulk import wrote timelogs without going through ``save()``.
+# ``keys`` is the set of affected ``(user_id, year, month)`` tuples and
+# ``inserted`` the number of new entries.
+timelogs_imported = Signal()
+
+COUNTED_MODELS = {
+    User: "users",
+    WorkTimeEntry: "worklogs",
+    Task: "tasks",
+    Leave: "leaves",
+}
+
+
+@receiver(pre_save, sender=WorkTimeEntry)
+def remember_previous_month(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = (
+            sender.objects.filter(pk=instance.pk).values_list("user_id", "date").first()
+        )
+    instance._previous_month = month_key(*previous) if previous else None
+
+
+@receiver(post_save, sender=WorkTimeEntry)
+def update_months_on_save(sender, instance, **kwargs):
+    keys = {month_key(instance.user_id, instance.date)}
+    if getattr(instance, "_previous_month", None):
+        keys.add(instance._previous_month)
+    refresh_rollups(keys)
+    bump_dashboard_versions(keys)
+
+
+@receiver(post_delete, sender=WorkTimeEntry)
+def update_months_on_delete(sender, instance, **kwargs):
+    keys = {month_key(instance.user_id, instance.date)}
+    refresh_rollups(keys)
+    bump_dashboard_versions(keys)
+
+
+@receiver(timelogs_imported)
+def update_months_on_import(sender, keys, **kwargs):
+    refresh_rollups(keys)
+    bump_dashboard_versions(keys)
+
+
+@receiver(timelogs_imported)
+def count_imported_entries(sender, inserted=0, **kwargs):
+    adjust_counter("worklogs", inserted)
+
+
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(COUNTED_MODELS[sender], 1)
+
+
+def count_deleted(sender, instance, **kwargs):
+    adjust_counter(COUNTED_MODELS[sender], -1)
+
+
+for model in COUNTED_MODELS:
+    post_save.connect(count_created, sender=model)
+    post_delete.connect(count_deleted, sender=model)
+
+
+@receiver(pre_save, sender=SalaryExpenses)
+def remember_previous_salary(sender, instance, **kwargs):
+    instance._previous_salary = (
+        sender.objects.filter(pk=instance.pk).values_list("salary", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=SalaryExpenses)
+def count_salary_change(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_salary", None) or 0
+    adjust_counter("expenses", instance.salary - previous)
+
+
+@receiver(post_delete, sender=SalaryExpenses)
+def count_salary_delete(sender, instance, **kwargs):
+    adjust_counter("expenses", -instance.salary)
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def bump_calendar_on_holiday_change(sender, **kwargs):
+    bump_calendar()
+    bump_all_dashboards()
+
+
+def leave_months(user_id, start_date, end_date):
+    return {(user_id, year, month) for year, month in iter_months(start_date, end_date)}
+
+
+@receiver(pre_save, sender=Leave)
+def remember_previous_period(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("user_id", "start_date", "end_date")
+            .first()
+        )
+    instance._previous_months = leave_months(*previous) if previous else set()
+
+
+@receiver(post_save, sender=Leave)
+def bump_dashboards_on_leave_save(sender, instance, **kwargs):
+    keys = leave_months(instance.user_id, instance.start_date, instance.end_date)
+    bump_dashboard_versions(keys | getattr(instance, "_previous_months", set()))
+
+
+@receiver(post_delete, sender=Leave)
+def bump_dashboards_on_leave_delete(sender, instance, **kwargs):
+    bump_dashboard_versions(
+        leave_months(instance.user_id, instance.start_date, instance.end_date)
+    )
+
+
+@receiver(post_save, sender=RecentActivity)
+def count_new_activity(sender, instance, created, **kwargs):
+    if created:
+        count_activity(instance.user_id, timezone.localdate(instance.timestamp))
+
+
+@receiver(post_delete, sender=RecentActivity)
+def count_deleted_activity(sender, instance, **kwargs):
+    count_activity(instance.user_id, timezone.localdate(instance.timestamp), -1)
@@ -1,3 +1,1256 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+from pypdf import PdfReader
+
+from avg_calc.activity import count_activity, top_active_users
+from avg_calc.counters import get_counters, reconcile_counters
+from avg_calc.exports import (
+    EXPORT_COLUMNS,
+    XLSX_CONTENT_TYPE,
+    export_queryset,
+    write_xlsx,
+)
+from avg_calc.imports import (
+    enqueue_import,
+    get_batch_size,
+    import_time_logs,
+    run_import_job,
+    with_report_previews,
+    write_entries,
+)
+from avg_calc.leave_index import LeaveIndex, on_leave
+from avg_calc.methods import log_activity
+from avg_calc.models import (
+    DailyActivityCount,
+    Holiday,
+    Leave,
+    OrgCounter,
+    PayrollSnapshot,
+    RecentActivity,
+    SalaryExpenses,
+    Task,
+    TimelogImport,
+    WorkTimeEntry,
+)
+from avg_calc.org_imports import import_org_time_logs, split_upload
+from avg_calc.pagination import KeysetPaginator, encode_cursor
+from avg_calc.payroll import (
+    close_month,
+    get_payroll,
+    payroll_rows,
+    payroll_totals,
+    reopen_month,
+)
+from avg_calc.pdf_cache import cached_pdf, evict, store_pdf
+from avg_calc.reports import render_worklog_range_pdf, stream_worklog_zip
+from avg_calc.versions import bump_versions
+from avg_calc.work_calendar import (
+    CALENDAR_VERSION_KEY,
+    month_bounds,
+    month_calendar,
+    working_day_counts,
+    working_days,
+)
+
+
+class DashboardTests(TestCase):
+    # Session, user and cache versions, plus the calendar version, leaves and
+    # month totals when the cache misses.
+    cached_queries = 3
+    query_budget = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("worker", password="secret")
+        for day in range(3, 8):
+            WorkTimeEntry.objects.create(
+                user=cls.user,
+                date=date(2025, 3, day),
+                login_time=time(9),
+                logout_time=time(18),
+                breakout_time=time(13),
+                breakin_time=time(13, 30),
+            )
+        Leave.objects.create(
+            user=cls.user,
+            start_date=date(2025, 3, 7),
+            end_date=date(2025, 3, 7),
+            reason="Personal",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_month_totals_exclude_leave_days(self):
+        response = self.client.get(reverse("dashboard"), {"month": 3, "year": 2025})
+
+        totals = response.context["month_totals"]
+        self.assertEqual(totals["entry_count"], 4)
+        self.assertEqual(totals["total_seconds"], 4 * 8.5 * 3600)
+        self.assertEqual(totals["leave_count"], 1)
+        self.assertEqual(totals["weekday_seconds"][4], 0)
+
+    def test_query_budget_does_not_grow_with_entries(self):
+        url = reverse("dashboard")
+        month_calendar(2025, 3)  # month calendars are memoized per version
+        with self.assertNumQueries(self.query_budget):
+            response = self.client.get(url, {"month": 3, "year": 2025})
+        self.assertEqual(response["X-Dashboard-Cache"], "miss")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for day in range(10, 29):
+                WorkTimeEntry.objects.create(
+                    user=self.user,
+                    date=date(2025, 3, day),
+                    login_time=time(9),
+                    logout_time=time(18),
+                    breakout_time=time(13),
+                    breakin_time=time(13, 30),
+                )
+        with self.assertNumQueries(self.query_budget):
+            response = self.client.get(url, {"month": 3, "year": 2025})
+        self.assertEqual(response["X-Dashboard-Cache"], "miss")
+        self.assertEqual(response.context["month_totals"]["entry_count"], 23)
+
+    def test_repeat_views_are_served_from_cache(self):
+        url = reverse("dashboard")
+        self.client.get(url, {"month": 3, "year": 2025})
+        with self.assertNumQueries(self.cached_queries):
+            response = self.client.get(url, {"month": 3, "year": 2025})
+        self.assertEqual(response["X-Dashboard-Cache"], "hit")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Leave.objects.create(
+                user=self.user,
+                start_date=date(2025, 3, 3),
+                end_date=date(2025, 3, 3),
+                reason="Personal",
+            )
+        response = self.client.get(url, {"month": 3, "year": 2025})
+        self.assertEqual(response["X-Dashboard-Cache"], "miss")
+        self.assertEqual(response.context["month_totals"]["entry_count"], 3)
+
+    def test_staff_counters_follow_writes(self):
+        staff = User.objects.create_user("manager", is_staff=True)
+        self.client.force_login(staff)
+
+        def worklogs():
+            response = self.client.get(reverse("dashboard"))
+            return response.context["admin_stats"][1]["value"]
+
+        self.assertEqual(worklogs(), 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkTimeEntry.objects.filter(date=date(2025, 3, 3)).delete()
+        self.assertEqual(worklogs(), 4)
+
+
+@override_settings(ORG_COUNTER_SHARDS=4)
+class OrgCounterTests(TestCase):
+    def test_writes_spread_over_shards_and_reconcile_folds_them(self):
+        self.assertEqual(get_counters()["tasks"], 0)
+        user = User.objects.create_user("counted")
+        for number in range(20):
+            Task.objects.create(
+                user=user,
+                task_name=f"Task {number}",
+                expected_time=timedelta(hours=1),
+                start_time=timezone.now(),
+                total_hours=1,
+                expected_completion_date=date(2025, 3, 3),
+            )
+        Task.objects.filter(task_name="Task 0").delete()
+
+        rows = OrgCounter.objects.filter(name="tasks")
+        self.assertGreater(rows.count(), 2)
+        self.assertLessEqual(rows.count(), 5)
+        self.assertEqual(get_counters()["tasks"], 19)
+
+        # Rows removed without signals leave drift for the reconcile to fix
+        Task.objects.filter(task_name="Task 1")._raw_delete("default")
+        self.assertEqual(reconcile_counters()["tasks"], -1)
+        self.assertEqual(list(rows.values_list("shard", "value")), [(0, 18)])
+        self.assertEqual(get_counters()["tasks"], 18)
+
+
+class ActivityCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+
+    def test_logged_and_deleted_activity_is_counted_per_day(self):
+        for _ in range(3):
+            log_activity(self.alice, "Logged in")
+        log_activity(self.bob, "Logged in")
+        RecentActivity.objects.filter(user=self.alice).first().delete()
+
+        top = top_active_users()
+        self.assertEqual(
+            [(row["username"], row["activity_count"]) for row in top],
+            [("alice", 2), ("bob", 1)],
+        )
+        self.assertEqual(top[0]["activity_description"], "Most active this week")
+        self.assertEqual(DailyActivityCount.objects.get(user=self.alice).count, 2)
+
+    def test_decrements_stop_at_zero_and_create_no_rows(self):
+        today = timezone.localdate()
+        count_activity(self.alice.pk, today, 2)
+        count_activity(self.alice.pk, today, -5)
+        count_activity(self.bob.pk, today, -1)
+
+        self.assertEqual(
+            list(DailyActivityCount.objects.values_list("user__username", "count")),
+            [("alice", 0)],
+        )
+
+    def test_window_and_limit(self):
+        today = timezone.localdate()
+        count_activity(self.alice.pk, today - timedelta(days=7), 10)
+        count_activity(self.bob.pk, today, 1)
+
+        self.assertEqual([row["username"] for row in top_active_users()], ["bob"])
+        top = top_active_users(days=8)
+        self.assertEqual([row["username"] for row in top], ["alice", "bob"])
+        self.assertEqual(
+            top[0]["activity_description"], "Most active in the last 8 days"
+        )
+        self.assertEqual(len(top_active_users(limit=1, days=8)), 1)
+
+
+class TrendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user("manager", is_staff=True)
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+        for user, days in [(cls.alice, (3, 4)), (cls.bob, (3,))]:
+            for day in days:
+                WorkTimeEntry.objects.create(
+                    user=user,
+                    date=date(2025, 3, day),
+                    login_time=time(9),
+                    logout_time=time(18),
+                    breakout_time=time(13),
+                    breakin_time=time(14),
+                )
+
+    def trends(self, viewer, **params):
+        self.client.force_login(viewer)
+        return self.client.get(reverse("trends-data"), params).json()
+
+    def test_year_and_month_count_are_clamped(self):
+        today = datetime.now().date()
+        for params, first, count in [
+            ({"year": "2025"}, (2025, 1), 12),
+            ({"year": "99999"}, (9999, 1), 12),
+            ({"year": "0"}, (1, 1), 12),
+            ({"months": "600"}, None, 60),
+            ({"months": "0"}, None, 12),
+            ({"months": "-3"}, None, 12),
+        ]:
+            with self.subTest(params=params):
+                months = [
+                    (month["year"], month["month"])
+                    for month in self.trends(self.alice, **params)["months"]
+                ]
+                self.assertEqual(len(months), count)
+                if first:
+                    self.assertEqual(months[0], first)
+                else:
+                    self.assertEqual(months[-1], (today.year, today.month))
+
+    def test_staff_see_the_organization_and_the_target_gap(self):
+        data = self.trends(self.manager, year="2025")
+
+        march = data["months"][2]
+        self.assertIsNone(data["user"])
+        self.assertEqual(data["target_seconds"], 8 * 3600 + 40 * 60)
+        self.assertEqual((march["entry_count"], march["user_count"]), (3, 2))
+        self.assertEqual(march["average_seconds"], 8 * 3600)
+        self.assertEqual(march["target_gap_seconds"], -40 * 60)
+        # Months without timelogs have no gap to the target
+        self.assertEqual(data["months"][3]["target_gap_seconds"], 0)
+
+        data = self.trends(self.manager, year="2025", user=self.bob.pk)
+        self.assertEqual(data["user"], "bob")
+        self.assertEqual(data["months"][2]["entry_count"], 1)
+
+    def test_users_only_see_their_own_trend(self):
+        data = self.trends(self.alice, year="2025", user=self.bob.pk)
+
+        self.assertEqual(data["user"], "alice")
+        march = data["months"][2]
+        self.assertEqual((march["entry_count"], march["user_count"]), (2, 1))
+
+    def test_page_labels_the_gap_to_the_target(self):
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse("trends"), {"year": "2025"})
+
+        months = response.context["months"]
+        self.assertEqual(months[2]["label"], "Mar 2025")
+        self.assertEqual(months[2]["gap_label"], "-0 hrs, 40 mins")
+        self.assertEqual(months[2]["percent"], 100)
+        self.assertEqual((months[3]["gap_label"], months[3]["percent"]), ("-", 0))
+
+
+class WorkCalendarTests(TestCase):
+    def working_days(self):
+        return int(month_calendar(2025, 3)[1].sum())
+
+    def test_holiday_changes_reach_memoized_calendars(self):
+        before = self.working_days()
+
+        holiday = Holiday.objects.create(date=date(2025, 3, 5), name="Festival")
+        self.assertEqual(self.working_days(), before - 1)
+
+        holiday.delete()
+        self.assertEqual(self.working_days(), before)
+
+    def test_version_bumped_by_another_process_rebuilds_calendars(self):
+        before = self.working_days()
+        # Another process adds a holiday: its rows and version bump are all
+        # this process sees, its memoized months are never cleared here.
+        Holiday.objects.bulk_create([Holiday(date=date(2025, 3, 5), name="Festival")])
+        self.assertEqual(self.working_days(), before)
+
+        bump_versions([CALENDAR_VERSION_KEY])
+        self.assertEqual(self.working_days(), before - 1)
+
+
+class LeaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+        # Two overlapping leaves across the end of March, and a one-day leave
+        for user, start, end in [
+            (cls.alice, date(2025, 3, 28), date(2025, 4, 2)),
+            (cls.alice, date(2025, 3, 31), date(2025, 4, 4)),
+            (cls.bob, date(2025, 3, 3), date(2025, 3, 3)),
+        ]:
+            Leave.objects.create(
+                user=user, start_date=start, end_date=end, reason="Travel"
+            )
+
+    def test_index_merges_leaves_across_months(self):
+        leaves = LeaveIndex.for_range(date(2025, 3, 1), date(2025, 4, 30))
+        days = [date(2025, 3, d) for d in (3, 27, 28, 31)] + [
+            date(2025, 4, d) for d in (1, 4, 5)
+        ]
+
+        self.assertEqual(
+            leaves.contains(self.alice.pk, days).tolist(),
+            [False, False, True, True, True, True, False],
+        )
+        self.assertEqual(
+            leaves.contains(self.bob.pk, days).tolist(),
+            [True, False, False, False, False, False, False],
+        )
+        self.assertEqual(len(leaves.starts), 2)
+
+    def test_index_for_a_range_only_loads_overlapping_leaves(self):
+        leaves = LeaveIndex.for_range(date(2025, 4, 3), date(2025, 4, 30))
+        users = [self.alice.pk] * 3 + [self.bob.pk]
+        days = [
+            date(2025, 4, 3),
+            date(2025, 3, 31),
+            date(2025, 3, 29),
+            date(2025, 3, 3),
+        ]
+
+        # Only the leave reaching into the range is loaded, in full
+        self.assertEqual(
+            leaves.contains(users, days).tolist(), [True, True, False, False]
+        )
+
+    def test_on_leave_matches_the_index(self):
+        for day in [date(2025, 3, 27), date(2025, 3, 31), date(2025, 4, 4)]:
+            WorkTimeEntry.objects.create(
+                user=self.alice,
+                date=day,
+                login_time=time(9),
+                logout_time=time(18),
+                breakout_time=time(13),
+                breakin_time=time(14),
+            )
+
+        flags = dict(
+            WorkTimeEntry.objects.annotate(away=on_leave()).values_list("date", "away")
+        )
+
+        self.assertEqual(
+            flags,
+            {date(2025, 3, 27): False, date(2025, 3, 31): True, date(2025, 4, 4): True},
+        )
+
+    def test_working_day_counts_subtract_each_users_leaves(self):
+        april = working_days(date(2025, 4, 1), date(2025, 4, 30))
+        leave_days = working_days(date(2025, 4, 1), date(2025, 4, 4))
+
+        counts = working_day_counts(
+            [self.alice.pk, self.bob.pk], date(2025, 4, 1), date(2025, 4, 30)
+        )
+
+        self.assertEqual(counts[self.alice.pk], len(april) - len(leave_days))
+        self.assertEqual(counts[self.bob.pk], len(april))
+
+    def test_work_view_shows_the_users_working_days(self):
+        today = date.today()
+        Leave.objects.create(
+            user=self.bob, start_date=today, end_date=today, reason="Errand"
+        )
+        self.client.force_login(self.bob)
+
+        response = self.client.get(reverse("worktime"))
+
+        company = len(working_days(*month_bounds(today.year, today.month)))
+        away = len(working_days(today, today))
+        self.assertEqual(response.context["working_days"], company - away)
+
+    def test_payroll_listing_shows_working_days(self):
+        SalaryExpenses.objects.create(user=self.alice, salary=Decimal("1000.00"))
+        SalaryExpenses.objects.create(user=self.bob, salary=Decimal("1000.00"))
+        self.client.force_login(User.objects.create_user("boss", is_staff=True))
+
+        response = self.client.get(reverse("expenses"), {"month": 3, "year": 2025})
+
+        march = len(working_days(date(2025, 3, 1), date(2025, 3, 31)))
+        leave_days = len(working_days(date(2025, 3, 28), date(2025, 3, 31)))
+        self.assertEqual(
+            {
+                row["username"]: row["working_days"]
+                for row in response.context["entries"]
+            },
+            {"alice": march - leave_days, "bob": march - 1},
+        )
+
+
+class TimelogUpsertTests(TestCase):
+    header = "Date,Login Time,Logout Time,Break-Out Time,Break-In Time\n"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("importer")
+
+    def upload(self, *rows, mode="upsert"):
+        content = (self.header + "".join(f"{row}\n" for row in rows)).encode()
+        return import_time_logs(
+            self.user, SimpleUploadedFile("timelogs.csv", content), mode=mode
+        )
+
+    @override_settings(TIMELOG_IMPORT_BATCH_SIZE=20000)
+    def test_batches_stay_within_the_bind_parameter_limit(self):
+        days = [date(1990, 1, 1) + timedelta(days=offset) for offset in range(9400)]
+
+        result = self.upload(
+            *(f"{day:%d-%m-%Y},09:00:00,18:00:00,13:00:00,14:00:00" for day in days)
+        )
+
+        self.assertEqual(get_batch_size(), 65535 // 7)
+        self.assertEqual(result.inserted, 9400)
+
+    def test_counts_created_updated_and_unchanged_rows(self):
+        result = self.upload(
+            "03-03-2025,09:00:00,18:00:00,13:00:00,14:00:00",
+            "04-03-2025,09:00:00,18:00:00,13:00:00,14:00:00",
+        )
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (2, 0, 0))
+
+        result = self.upload(
+            "03-03-2025,09:00:00,18:00:00,13:00:00,14:00:00",
+            "04-03-2025,10:00:00,18:00:00,13:00:00,14:00:00",
+            "05-03-2025,09:00:00,18:00:00,13:00:00,14:00:00",
+        )
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (1, 1, 1))
+        entry = WorkTimeEntry.objects.get(user=self.user, date=date(2025, 3, 4))
+        self.assertEqual(entry.login_time, time(10))
+        self.assertEqual(entry.total_work_time, timedelta(hours=7))
+        self.assertEqual(WorkTimeEntry.objects.filter(user=self.user).count(), 3)
+
+    def test_reimporting_a_file_changes_nothing(self):
+        rows = [
+            "03-03-2025,09:00:00,18:00:00,13:00:00,14:00:00",
+            "04-03-2025,09:30:00,18:00:00,13:00:00,13:30:00",
+        ]
+        self.upload(*rows)
+        stored = list(WorkTimeEntry.objects.filter(user=self.user).values())
+
+        result = self.upload(*rows)
+
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 2))
+        self.assertEqual(
+            list(WorkTimeEntry.objects.filter(user=self.user).values()), stored
+        )
+
+    def test_insert_mode_keeps_existing_days(self):
+        self.upload("03-03-2025,09:00:00,18:00:00,13:00:00,14:00:00")
+
+        result = self.upload(
+            "03-03-2025,10:00:00,18:00:00,13:00:00,14:00:00", mode="insert"
+        )
+
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 1))
+        entry = WorkTimeEntry.objects.get(user=self.user, date=date(2025, 3, 3))
+        self.assertEqual(entry.login_time, time(9))
+
+    def test_dry_run_reports_field_changes_without_writing(self):
+        self.upload("03-03-2025,09:00:00,18:00:00,13:00:00,14:00:00")
+
+        result = self.upload(
+            "03-03-2025,10:00:00,18:00:00,13:00:00,14:00:00",
+            "04-03-2025,09:00:00,18:00:00,13:00:00,14:00:00",
+            mode="dry_run",
+        )
+
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (1, 1, 0))
+        self.assertEqual(WorkTimeEntry.objects.filter(user=self.user).count(), 1)
+        job = TimelogImport.objects.get(pk=result.job_id)
+        self.assertEqual(job.mode, "dry_run")
+        [change] = job.changes
+        self.assertEqual(change["date"], "2025-03-03")
+        self.assertEqual(set(change["fields"]), {"login_time", "total_work_time"})
+        self.assertEqual(change["fields"]["login_time"], ["09:00:00", "10:00:00"])
+
+    def test_upload_form_lists_missing_columns(self):
+        self.client.force_login(self.user)
+        files = {
+            "missing.csv": b"Date,Login Time,Logout Time\n03-03-2025,09:00:00,18:00:00\n",
+            "empty.csv": b"\n",
+            "broken.xlsx": b"not a workbook",
+        }
+        errors = {}
+        for name, content in files.items():
+            response = self.client.post(
+                reverse("import-timelogs"),
+                {"excel_file": SimpleUploadedFile(name, content), "mode": "upsert"},
+            )
+            self.assertEqual(response.status_code, 200)
+            errors[name] = response.context["form"].errors["excel_file"]
+
+        self.assertEqual(
+            errors["missing.csv"], ["Missing columns: Break-Out Time, Break-In Time."]
+        )
+        self.assertIn("Missing columns: Date", errors["empty.csv"][0])
+        self.assertEqual(
+            errors["broken.xlsx"], ["The file is not a readable workbook."]
+        )
+        self.assertFalse(TimelogImport.objects.exists())
+
+
+class ImportJobTests(TestCase):
+    header = TimelogUpsertTests.header
+    valid = "{:02d}-03-2025,09:00:00,18:00:00,13:00:00,14:00:00"
+    invalid = "{:02d}-03-2025,09:00:00,18:00:00,14:00:00,13:00:00"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("streamer")
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+    def enqueue(self, *rows):
+        content = (self.header + "".join(f"{row}\n" for row in rows)).encode()
+        return enqueue_import(self.user, SimpleUploadedFile("timelogs.csv", content))
+
+    @override_settings(TIMELOG_IMPORT_ERROR_LIMIT=3)
+    def test_error_report_is_capped(self):
+        job = self.enqueue(*(self.invalid.format(day) for day in range(3, 8)))
+
+        run_import_job(job, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.rows_failed, 5)
+        self.assertEqual([error["row"] for error in job.errors], [2, 3, 4])
+
+    def test_failed_chunk_leaves_no_errors_behind(self):
+        job = self.enqueue(
+            self.invalid.format(3),
+            self.valid.format(4),
+            self.invalid.format(5),
+            self.valid.format(6),
+        )
+        calls = []
+
+        def fail_second_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("database went away")
+            return write_entries(*args, **kwargs)
+
+        with patch("avg_calc.imports.write_entries", fail_second_chunk):
+            run_import_job(job, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual((job.rows_committed, job.rows_failed), (2, 1))
+        self.assertEqual(
+            [(error["row"], error["error"]) for error in job.errors],
+            [(2, "Break-in time is before break-out time"), (4, "database went away")],
+        )
+
+    def test_streamed_and_whole_file_imports_reject_the_same_rows(self):
+        rows = [
+            self.valid.format(3),
+            "",
+            self.valid.format(4),
+            self.invalid.format(5),
+            self.valid.format(3),
+            self.valid.format(6),
+        ]
+        # With two lines per chunk, the 3rd is repeated in the 1st and 3rd chunk
+        job = self.enqueue(*rows)
+        run_import_job(job, chunk_size=2)
+        job.refresh_from_db()
+        streamed = [(error["row"], error["error"]) for error in job.errors]
+        WorkTimeEntry.objects.all().delete()
+
+        content = (self.header + "".join(f"{row}\n" for row in rows)).encode()
+        result = import_time_logs(
+            self.user, SimpleUploadedFile("timelogs.csv", content)
+        )
+
+        self.assertEqual(
+            streamed,
+            [
+                (2, "Duplicate date in file"),
+                (5, "Break-in time is before break-out time"),
+                (6, "Duplicate date in file"),
+            ],
+        )
+        self.assertEqual(
+            [
+                (error["row"], error["error"])
+                for error in TimelogImport.objects.get(pk=result.job_id).errors
+            ],
+            streamed,
+        )
+        self.assertEqual(
+            sorted(WorkTimeEntry.objects.values_list("date", flat=True)),
+            [date(2025, 3, 4), date(2025, 3, 6)],
+        )
+
+    def test_failed_job_resumes_after_its_last_committed_chunk(self):
+        rows = [self.valid.format(day) for day in range(3, 9)]
+        job = self.enqueue(*rows)
+        calls = []
+
+        def fail_second_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("database went away")
+            return write_entries(*args, **kwargs)
+
+        with patch("avg_calc.imports.write_entries", fail_second_chunk):
+            run_import_job(job, chunk_size=2)
+        self.assertEqual((job.status, job.rows_committed), ("failed", 2))
+
+        # Uploading the same file again requeues the failed job
+        resumed = self.enqueue(*rows)
+        self.assertEqual((resumed.pk, resumed.status), (job.pk, "queued"))
+        result = run_import_job(resumed, chunk_size=2)
+
+        resumed.refresh_from_db()
+        self.assertEqual((result.resumed_from, result.rows), (2, 4))
+        self.assertEqual(resumed.status, "done")
+        self.assertEqual((resumed.rows_committed, resumed.rows_imported), (6, 6))
+        self.assertEqual(WorkTimeEntry.objects.filter(user=self.user).count(), 6)
+
+    def test_worker_runs_queued_jobs_and_removes_finished_uploads(self):
+        done = self.enqueue(self.valid.format(3), self.valid.format(4))
+        failed = self.enqueue(self.valid.format(5))
+        output = io.StringIO()
+
+        def fail_one_job(user_id, frame, *args):
+            if date(2025, 3, 5) in frame["date"].values:
+                raise RuntimeError("database went away")
+            return write_entries(user_id, frame, *args)
+
+        # The worker would close the test transaction's connection between jobs
+        with patch("avg_calc.imports.write_entries", fail_one_job), patch(
+            "avg_calc.management.commands.run_import_worker.close_old_connections"
+        ):
+            call_command("run_import_worker", "--once", stdout=output)
+
+        done.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual((done.status, done.rows_imported), ("done", 2))
+        self.assertEqual(failed.status, "failed")
+        self.assertIn("Imported 2 rows: 2 added", output.getvalue())
+        self.assertIn("Import failed: database went away", output.getvalue())
+        # Only the failed job keeps its upload, to resume from it
+        self.assertFalse(done.file)
+        self.assertTrue(failed.file.storage.exists(failed.file.name))
+
+    @override_settings(TIMELOG_IMPORT_ASYNC=True)
+    def test_status_endpoint_reports_progress_to_its_owner(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile(
+            "timelogs.csv",
+            (
+                self.header
+                + "".join(f"{self.invalid.format(day)}\n" for day in range(3, 6))
+            ).encode(),
+        )
+        response = self.client.post(
+            reverse("import-timelogs"), {"excel_file": upload, "mode": "upsert"}
+        )
+        job = TimelogImport.objects.get()
+        status_url = reverse("import-status", args=[job.pk])
+
+        self.assertEqual(job.status, "queued")
+        self.assertRedirects(
+            response,
+            f"{reverse('import-timelogs')}?job={job.pk}",
+            fetch_redirect_response=False,
+        )
+        self.assertFalse(self.client.get(status_url).json()["finished"])
+
+        run_import_job(job)
+        with patch(
+            "avg_calc.views.with_report_previews",
+            lambda jobs: with_report_previews(jobs, size=2),
+        ):
+            status = self.client.get(status_url).json()
+
+        self.assertEqual(
+            {key: status[key] for key in ("status", "rows_total", "rows_failed")},
+            {"status": "done", "rows_total": 3, "rows_failed": 3},
+        )
+        self.assertTrue(status["finished"])
+        self.assertEqual([error["row"] for error in status["errors"]], [2, 3])
+
+        self.client.force_login(User.objects.create_user("stranger"))
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+
+class OrgImportTests(TestCase):
+    columns = ["Date", "Login Time", "Logout Time", "Break-Out Time", "Break-In Time"]
+    day = ["09:00:00", "18:00:00", "13:00:00", "14:00:00"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", is_staff=True)
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+
+    def workbook(self, sheets):
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        for title, rows in sheets.items():
+            sheet = workbook.create_sheet(title)
+            for row in rows:
+                sheet.append(row)
+        content = io.BytesIO()
+        workbook.save(content)
+        return SimpleUploadedFile("team.xlsx", content.getvalue())
+
+    def test_sheet_per_user_with_unknown_users_and_other_sheets(self):
+        upload = self.workbook(
+            {
+                "alice": [
+                    self.columns,
+                    ["03-03-2025", *self.day],
+                    [],
+                    ["04-03-2025", *self.day],
+                ],
+                "bob": [self.columns, ["03-03-2025", "x", *self.day[1:]]],
+                "carol": [self.columns, ["03-03-2025", *self.day]],
+                "Summary": [["Total"], [42]],
+            }
+        )
+
+        result, unknown_users = import_org_time_logs(self.admin, upload, workers=1)
+
+        self.assertEqual(unknown_users, ["carol"])
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual(
+            sorted(WorkTimeEntry.objects.values_list("user__username", "date")),
+            [("alice", date(2025, 3, 3)), ("alice", date(2025, 3, 4))],
+        )
+        errors = TimelogImport.objects.get(pk=result.job_id).errors
+        self.assertEqual(
+            [(error["Source"], error["row"], error["error"]) for error in errors],
+            [
+                ("Summary", 1, "Missing columns: " + ", ".join(self.columns)),
+                ("bob", 2, "Invalid Login Time"),
+            ],
+        )
+
+    @override_settings(TIMELOG_IMPORT_PART_BYTES=64)
+    def test_large_csv_is_split_into_byte_ranges(self):
+        lines = [",".join(["Username", *self.columns])]
+        for day in range(3, 9):
+            lines.append(",".join(["alice", f"0{day}-03-2025", *self.day]))
+            lines.append(",".join(["bob", f"0{day}-03-2025", *self.day]))
+        # A blank line, and a day repeated in two different parts
+        lines[5:5] = ["", ",".join(["bob", "08-03-2025", *self.day])]
+        upload = SimpleUploadedFile("team.csv", "\n".join(lines).encode())
+
+        with tempfile.TemporaryDirectory() as workdir:
+            parts, rejected = split_upload(upload, workdir, workers=3)
+        # Ranges start on line breaks and are numbered like the sheet, so the
+        # repeated day on rows 7 and 15 lands in two different parts
+        content = upload.read()
+        self.assertEqual(len(parts), 3)
+        for _, _, _, start, _, first_row in parts:
+            self.assertEqual(content[start - 1 : start], b"\n")
+            self.assertEqual(content[:start].count(b"\n") + 1, first_row)
+        self.assertTrue(7 < parts[1][5] <= parts[2][5] <= 15)
+
+        result, unknown_users = import_org_time_logs(self.admin, upload, workers=3)
+
+        self.assertEqual(unknown_users, [])
+        self.assertEqual(result.inserted, 11)
+        errors = TimelogImport.objects.get(pk=result.job_id).errors
+        self.assertEqual(
+            sorted((error["row"], error["Username"]) for error in errors),
+            [(7, "bob"), (15, "bob")],
+        )
+        self.assertFalse(
+            WorkTimeEntry.objects.filter(user=self.bob, date=date(2025, 3, 8)).exists()
+        )
+
+
+@override_settings(PAYROLL_PF_DEDUCTION="200.00", PAYROLL_LUNCH_PER_DAY="33.33")
+class PayrollTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+        cls.admin = User.objects.create_superuser("root")
+        SalaryExpenses.objects.create(user=cls.alice, salary=Decimal("1000.10"))
+        SalaryExpenses.objects.create(user=cls.bob, salary=Decimal("2500.05"))
+        SalaryExpenses.objects.create(user=cls.admin, salary=Decimal("9999.99"))
+        for day in range(3, 6):
+            WorkTimeEntry.objects.create(
+                user=cls.alice,
+                date=date(2025, 3, day),
+                login_time=time(9),
+                logout_time=time(18),
+                breakout_time=time(13),
+                breakin_time=time(14),
+            )
+
+    def test_rows_and_totals_use_exact_decimals(self):
+        rows = {row["username"]: row for row in payroll_rows(2025, 3)}
+
+        self.assertEqual(list(rows), ["alice", "bob"])
+        alice = rows["alice"]
+        self.assertEqual(alice["present_days"], 3)
+        self.assertEqual(alice["pf"], Decimal("200.00"))
+        self.assertEqual(alice["payment"], Decimal("800.10"))
+        self.assertEqual(alice["lunch"], Decimal("99.99"))
+        self.assertEqual(alice["balance"], Decimal("700.11"))
+        self.assertEqual(rows["bob"]["balance"], Decimal("2300.05"))
+
+        totals = payroll_totals(payroll_rows(2025, 3))
+        self.assertEqual(totals["headcount"], 2)
+        self.assertEqual(totals["total_salary"], Decimal("3500.15"))
+        self.assertEqual(totals["total_lunch"], Decimal("99.99"))
+        self.assertEqual(totals["total_balance"], Decimal("3000.16"))
+
+    def test_superusers_are_left_out_of_the_organization_payroll_only(self):
+        close_month(2025, 3)
+
+        for month in (3, 4):
+            _, rows, _ = get_payroll(2025, month)
+            self.assertNotIn("root", [row["username"] for row in rows])
+            period, rows, totals = get_payroll(2025, month, self.admin)
+            self.assertIsNone(period)
+            self.assertEqual([row["username"] for row in rows], ["root"])
+            self.assertEqual(totals["total_salary"], Decimal("9999.99"))
+
+    def test_closed_month_is_frozen(self):
+        period = close_month(2025, 3, closed_by=self.bob)
+        self.assertEqual(period.headcount, 2)
+        self.assertEqual(period.lunch_per_day, Decimal("33.33"))
+        self.assertEqual(period.snapshots.count(), 2)
+        self.assertIsNone(close_month(2025, 3))
+
+        SalaryExpenses.objects.filter(user=self.alice).update(salary=Decimal("5000"))
+        WorkTimeEntry.objects.create(
+            user=self.alice,
+            date=date(2025, 3, 6),
+            login_time=time(9),
+            logout_time=time(18),
+            breakout_time=time(13),
+            breakin_time=time(14),
+        )
+        with override_settings(PAYROLL_LUNCH_PER_DAY="99.00"):
+            frozen, rows, totals = get_payroll(2025, 3)
+
+        self.assertEqual(frozen, period)
+        alice = rows.get(username="alice")
+        self.assertEqual(alice["salary"], Decimal("1000.10"))
+        self.assertEqual(alice["present_days"], 3)
+        self.assertEqual(alice["balance"], Decimal("700.11"))
+        self.assertEqual(totals["total_balance"], Decimal("3000.16"))
+
+        _, rows, totals = get_payroll(2025, 3, user=self.alice)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(totals["headcount"], 1)
+        self.assertEqual(totals["total_balance"], Decimal("700.11"))
+
+    def test_reopened_month_is_computed_live(self):
+        close_month(2025, 3)
+        SalaryExpenses.objects.filter(user=self.alice).update(salary=Decimal("5000"))
+
+        self.assertTrue(reopen_month(2025, 3))
+        self.assertFalse(reopen_month(2025, 3))
+        self.assertFalse(PayrollSnapshot.objects.exists())
+
+        period, rows, totals = get_payroll(2025, 3)
+        self.assertIsNone(period)
+        self.assertEqual(rows.get(username="alice")["balance"], Decimal("4700.01"))
+        self.assertEqual(totals["total_salary"], Decimal("7500.05"))
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Two users on the same five days, so pages split ties on the date
+        for username in ["first", "second"]:
+            user = User.objects.create_user(username)
+            for day in range(3, 8):
+                WorkTimeEntry.objects.create(
+                    user=user,
+                    date=date(2025, 3, day),
+                    login_time=time(9),
+                    logout_time=time(18),
+                    breakout_time=time(13),
+                    breakin_time=time(14),
+                )
+        cls.ordered = list(WorkTimeEntry.objects.order_by("date", "id"))
+
+    def paginator(self):
+        return KeysetPaginator(WorkTimeEntry.objects.all(), ("date", "id"), per_page=3)
+
+    def follow(self, url):
+        return self.paginator().get_page(QueryDict(url.lstrip("?")))
+
+    def test_forward_and_backward_cursors_walk_every_row_once(self):
+        page = self.paginator().get_page(QueryDict())
+        self.assertFalse(page.has_previous)
+        pages = [list(page)]
+        while page.has_next:
+            page = self.follow(page.next_url)
+            pages.append(list(page))
+
+        self.assertEqual([len(rows) for rows in pages], [3, 3, 3, 1])
+        self.assertEqual([row for rows in pages for row in rows], self.ordered)
+        # Page boundaries fall between two entries of the same date
+        self.assertEqual(pages[0][-1].date, pages[1][0].date)
+
+        backwards = [list(page)]
+        while page.has_previous:
+            page = self.follow(page.previous_url)
+            backwards.append(list(page))
+        self.assertEqual(backwards, pages[::-1])
+
+    def test_descending_order(self):
+        paginator = KeysetPaginator(
+            WorkTimeEntry.objects.all(), ("-date", "-id"), per_page=4
+        )
+        first = paginator.get_page(QueryDict())
+        second = paginator.get_page(QueryDict(first.next_url.lstrip("?")))
+        self.assertEqual(list(first) + list(second), self.ordered[::-1][:8])
+
+    def test_invalid_cursors_fall_back_to_the_first_page(self):
+        first_page = list(self.paginator().get_page(QueryDict()))
+        cursors = [
+            "not-a-cursor",
+            encode_cursor([date(2025, 3, 4)]),
+            encode_cursor(["abc", "abc"]),
+            encode_cursor([date(2025, 3, 4), "abc"]),
+            encode_cursor([date(2025, 3, 4), None]),
+            encode_cursor([[1], {"x": 1}]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                page = self.paginator().get_page(QueryDict(f"cursor={cursor}"))
+                self.assertEqual(list(page), first_page)
+                self.assertFalse(page.has_previous)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("exporter", is_staff=True)
+        for day in range(3, 8):
+            WorkTimeEntry.objects.create(
+                user=cls.user,
+                date=date(2025, 3, day),
+                login_time=time(9),
+                logout_time=time(18),
+                breakout_time=time(13),
+                breakin_time=time(14),
+            )
+
+    def read_workbook(self, output):
+        workbook = load_workbook(output)
+        sheets = {
+            sheet.title: [list(row) for row in sheet.values] for sheet in workbook
+        }
+        return workbook, sheets
+
+    def test_xlsx_continues_on_a_new_sheet(self):
+        entries = export_queryset(date(2025, 3, 1), date(2025, 3, 31))
+        _, sheets = self.read_workbook(write_xlsx(entries, rows_per_sheet=2))
+
+        self.assertEqual(list(sheets), ["Time Logs", "Time Logs 2", "Time Logs 3"])
+        self.assertEqual([len(rows) for rows in sheets.values()], [3, 3, 2])
+        for rows in sheets.values():
+            self.assertEqual(rows[0], EXPORT_COLUMNS)
+
+    def test_xlsx_cells_are_typed_and_formatted(self):
+        entries = export_queryset(date(2025, 3, 1), date(2025, 3, 31))
+        workbook, sheets = self.read_workbook(write_xlsx(entries))
+
+        self.assertEqual(
+            sheets["Time Logs"][1],
+            [
+                "exporter",
+                datetime(2025, 3, 3),
+                time(9),
+                time(18),
+                time(13),
+                time(14),
+                timedelta(hours=8),
+            ],
+        )
+        sheet = workbook["Time Logs"]
+        self.assertTrue(sheet["A1"].font.bold)
+        self.assertEqual(
+            [cell.number_format for cell in sheet[2]],
+            ["General", "dd-mm-yyyy", *["hh:mm:ss"] * 4, "[h]:mm:ss"],
+        )
+
+    def test_xlsx_export_can_be_imported_again(self):
+        entries = export_queryset(date(2025, 3, 1), date(2025, 3, 31))
+        upload = SimpleUploadedFile("export.xlsx", write_xlsx(entries).read())
+        WorkTimeEntry.objects.all().delete()
+
+        result, unknown_users = import_org_time_logs(self.user, upload, workers=1)
+
+        self.assertEqual(unknown_users, [])
+        self.assertEqual(result.inserted, 5)
+        self.assertEqual(
+            set(WorkTimeEntry.objects.values_list("total_work_time", flat=True)),
+            {timedelta(hours=8)},
+        )
+
+    def test_xlsx_view_returns_the_workbook(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("export-timelogs"),
+            {"start_date": "2025-03-01", "end_date": "2025-03-31", "format": "xlsx"},
+        )
+
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        self.assertIn('.xlsx"', response["Content-Disposition"])
+        _, sheets = self.read_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(len(sheets["Time Logs"]), 6)
+
+    def test_empty_xlsx_keeps_the_header(self):
+        entries = export_queryset(date(2024, 1, 1), date(2024, 1, 31))
+        _, sheets = self.read_workbook(write_xlsx(entries))
+        self.assertEqual(sheets, {"Time Logs": [EXPORT_COLUMNS]})
+
+
+class WorklogPdfCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("reporter", first_name="Ada")
+        cls.entry = WorkTimeEntry.objects.create(
+            user=cls.user,
+            date=date(2025, 3, 3),
+            login_time=time(9),
+            logout_time=time(18),
+            breakout_time=time(13),
+            breakin_time=time(14),
+        )
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        self.enterContext(override_settings(WORKLOG_PDF_CACHE_DIR=self.cache_dir))
+        self.client.force_login(self.user)
+
+    def download(self, **headers):
+        return self.client.get(
+            reverse("export-worklog"), {"month": 3, "year": 2025}, headers=headers
+        )
+
+    def cached_files(self):
+        return sorted(os.listdir(self.cache_dir))
+
+    def test_repeat_download_is_a_hit(self):
+        first = self.download()
+        self.assertEqual(first.status_code, 200)
+        key = first["ETag"].strip('"')
+        self.assertEqual(self.cached_files(), [f"{key}.pdf"])
+
+        second = self.download()
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(b"".join(second.streaming_content)[:4], b"%PDF")
+        self.assertEqual(len(self.cached_files()), 1)
+
+        not_modified = self.download(if_none_match=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_bulk_zip_renders_misses_in_worker_processes(self):
+        colleague = User.objects.create_user("colleague")
+        cached = self.download()
+
+        archive = zipfile.ZipFile(
+            io.BytesIO(
+                b"".join(stream_worklog_zip([self.user, colleague], 2025, 3, workers=2))
+            )
+        )
+
+        self.assertEqual(
+            sorted(archive.namelist()),
+            ["timelog_colleague_3_2025.pdf", "timelog_reporter_3_2025.pdf"],
+        )
+        self.assertEqual(
+            archive.read("timelog_reporter_3_2025.pdf"),
+            b"".join(cached.streaming_content),
+        )
+        self.assertEqual(len(self.cached_files()), 2)
+
+    def test_changed_timelog_or_name_misses(self):
+        etags = [self.download()["ETag"]]
+
+        self.entry.logout_time = time(19)
+        self.entry.save()
+        etags.append(self.download()["ETag"])
+
+        self.user.last_name = "Lovelace"
+        self.user.save()
+        etags.append(self.download()["ETag"])
+
+        self.assertEqual(len(set(etags)), 3)
+        self.assertEqual(len(self.cached_files()), 3)
+
+    def test_eviction_drops_least_recently_used(self):
+        for age, key in enumerate(["newest", "touched", "oldest"]):
+            path = store_pdf(key, b"%PDF" + b"0" * 96)
+            os.utime(path, (1000 - age * 100, 1000 - age * 100))
+        # A hit refreshes the file, so it outlives files stored after it
+        cached_pdf("touched")
+
+        self.assertEqual(evict(250), 1)
+        self.assertEqual(self.cached_files(), ["newest.pdf", "touched.pdf"])
+        self.assertIsNone(cached_pdf("oldest"))
+        self.assertEqual(evict(250), 0)
+
+
+class WorklogReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("ranger", first_name="Range")
+        for day in [date(2025, 2, 26), date(2025, 2, 27), date(2025, 2, 28)] + [
+            date(2025, 3, day) for day in range(3, 6)
+        ]:
+            WorkTimeEntry.objects.create(
+                user=cls.user,
+                date=day,
+                login_time=time(9),
+                logout_time=time(18),
+                breakout_time=time(13),
+                breakin_time=time(14),
+            )
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.enterContext(override_settings(WORKLOG_PDF_CACHE_DIR=cache_dir.name))
+        self.client.force_login(self.user)
+
+    def test_out_of_range_months_fall_back_or_clamp(self):
+        for params in [
+            {"month": 13, "year": 2025},
+            {"month": "x", "year": "y"},
+            {"month": 0, "year": 0},
+            {"month": 3, "year": 99999},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(reverse("export-worklog"), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], "application/pdf")
+
+    @override_settings(WORKLOG_PDF_CHUNK_ROWS=2)
+    def test_range_report_merges_chunks_in_order(self):
+        content = render_worklog_range_pdf(
+            self.user, date(2025, 2, 20), date(2025, 3, 10)
+        )
+        pages = [page.extract_text() for page in PdfReader(io.BytesIO(content)).pages]
+
+        # February, March and the range summary are rendered as separate chunks
+        self.assertEqual(len(pages), 3)
+        self.assertIn("Timelogs for Range", pages[0])
+        self.assertNotIn("Timelogs for Range", "".join(pages[1:]))
+        self.assertIn("2025-02-26", pages[0])
+        self.assertIn("2025-03-03", pages[1])
+        self.assertNotIn("2025-02", pages[1])
+
+    @override_settings(WORKLOG_PDF_ENGINE="reportlab")
+    def test_reportlab_engine_draws_the_month(self):
+        response = self.client.get(
+            reverse("export-worklog"), {"month": 3, "year": 2025}
+        )
+        reader = PdfReader(io.BytesIO(b"".join(response.streaming_content)))
+        text = "".join(page.extract_text() for page in reader.pages)
+
+        self.assertIn("ReportLab", reader.metadata.producer)
+        self.assertIn("Timelogs for Range - March 2025", text)
+        self.assertIn("Net Present Days: 3", text)
+        self.assertIn("2025-03-05", text)
+        self.assertNotIn("2025-02", text)
+
+    @override_settings(WORKLOG_PDF_ENGINE="reportlab", WORKLOG_PDF_CHUNK_ROWS=2)
+    def test_reportlab_range_report_merges_chunks_in_order(self):
+        content = render_worklog_range_pdf(
+            self.user, date(2025, 2, 20), date(2025, 3, 10)
+        )
+        pages = [page.extract_text() for page in PdfReader(io.BytesIO(content)).pages]
+
+        self.assertEqual(len(pages), 3)
+        self.assertIn("Timelogs for Range", pages[0])
+        self.assertIn("2025-02-26", pages[0])
+        self.assertIn("2025-03-03", pages[1])
+        self.assertNotIn("2025-02", pages[1])
+        self.assertIn("Summary Report", pages[2])
+
+    def test_range_report_is_served_as_a_download(self):
+        response = self.client.get(
+            reverse("export-worklog"),
+            {"start_date": "2025-02-20", "end_date": "2025-03-10"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            "timelog_2025-02-20_2025-03-10.pdf", response["Content-Disposition"]
+        )
+        content = b"".join(response.streaming_content)
+        self.assertGreaterEqual(len(PdfReader(io.BytesIO(content)).pages), 1)
@@ -14,9 +14,23 @@ urlpatterns = [
     path("timelogs/delete/<int:pk>/", views.delete_timelogs, name="delete-timelogs"),
     path("create-timelogs/", views.create_timelogs, name="create-timelogs"),
     path("dashboard/", views.dashboard, name="dashboard"),
+    path("trends/", views.trends, name="trends"),
+    path("trends/data/", views.trends_data, name="trends-data"),
     path("upload-timelogs/", views.upload_time_logs, name="import-timelogs"),
+    path("upload-timelogs/<int:pk>/status/", views.import_status, name="import-status"),
+    path(
+        "upload-timelogs/<int:pk>/errors/",
+        views.export_import_errors,
+        name="import-errors",
+    ),
+    path(
+        "upload-timelogs/organization/",
+        views.upload_org_time_logs,
+        name="import-org-timelogs",
+    ),
     path("export-template/", views.export_template, name="export-template"),
     path("expenses/", views.total_expenses, name="expenses"),
+    path("expenses/period/", views.update_payroll_period, name="payroll-period"),
     path("create-expenses/", views.update_salary_expenses, name="create-expenses"),
     path("calculate-time/", views.calculate_work_time, name="calculate-time"),
     path("time-details/<int:pk>/", views.work_summary_detail, name="time-details"),
@@ -28,7 +42,13 @@ urlpatterns = [
     path("users/", views.users, name="user-list"),
     path("edit-user/<int:user_id>", views.edit_user, name="edit-user"),
     path("delete-user/<int:user_id>", views.delete_user, name="delete-user"),
+    path("export-timelogs/", views.export_timelogs, name="export-timelogs"),
     path("export-timelogs/pdf/", views.export_worklog, name="export-worklog"),
+    path(
+        "export-timelogs/pdf/all/",
+        views.export_worklogs_zip,
+        name="export-worklogs-zip",
+    ),
     path(
         "leave/<int:leave_id>/status/",
         views.update_leave_status,
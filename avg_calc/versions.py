@@ -0,0 +1,45 @@
+from django.db import connection
+
+from avg_calc.models import CacheVersion
+
+VERSION_SEQUENCE = "avg_calc_cacheversion_version_seq"
+
+
+def get_versions(keys):
+    """
+    Reads the current version of every key with one query.
+
+    Returns:
+        dict: Versions keyed by key, 0 for keys that were never bumped.
+    """
+    stored = dict(
+        CacheVersion.objects.filter(key__in=keys).values_list("key", "version")
+    )
+    return {key: stored.get(key, 0) for key in keys}
+
+
+def bump_versions(keys):
+    """
+    Moves every key to a new version with one ``INSERT ... ON CONFLICT``
+    statement in the current transaction.
+
+    The bump commits or rolls back with the write that caused it and is seen
+    by every process, so per-process caches keyed on versions never serve a
+    value from before the write. New versions come from a sequence, so a
+    version that was only seen inside a rolled-back transaction is never
+    reused. Keys are locked in sorted order so concurrent bumps cannot
+    deadlock.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(CacheVersion._meta.db_table)} AS current "
+            f"({quote('key')}, {quote('version')}) "
+            f"SELECT key, nextval(%s) FROM unnest(%s::varchar[]) AS key "
+            f"ON CONFLICT ({quote('key')}) DO UPDATE SET "
+            f"{quote('version')} = EXCLUDED.{quote('version')}",
+            [VERSION_SEQUENCE, keys],
+        )
@@ -1,7 +1,8 @@
 from calendar import monthrange
-from datetime import date, datetime, time, timedelta
+from datetime import MAXYEAR, MINYEAR, date, datetime, timedelta
 
 import pandas as pd
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate
@@ -12,72 +13,105 @@ from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
-from django.db.models import CharField, Count, Sum, Value
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.core.cache import cache
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render, reverse
-from django.template.loader import get_template
 from django.template.response import TemplateResponse
 from django.urls import reverse
-from django.utils.timezone import is_naive, localtime, make_aware
+from django.utils.http import parse_etags, quote_etag
 from django.views.decorators.http import require_POST
-from xhtml2pdf import pisa
 
+from avg_calc.activity import top_active_users
+from avg_calc.counters import get_counters
+from avg_calc.dashboard_cache import dashboard_cache_key, get_dashboard_cache_timeout
+from avg_calc.exports import (
+    XLSX_CONTENT_TYPE,
+    export_queryset,
+    stream_csv,
+    write_xlsx,
+)
 from avg_calc.forms import (
     ChangePasswordForm,
     DailyWorkSummaryForm,
     LeaveForm,
     MonthChoiceForm,
+    OrgUploadForm,
     RegisterForm,
     SalaryExpensesForm,
     TaskForm,
+    TimelogExportForm,
     UploadExcelForm,
     UserEditForm,
     WorkTimeEntryForm,
 )
+from avg_calc.imports import (
+    TIMELOG_COLUMNS,
+    USERNAME_COLUMN,
+    enqueue_import,
+    import_time_logs,
+    run_import_job,
+    use_streaming,
+    with_report_previews,
+)
+from avg_calc.leave_index import on_leave
 from avg_calc.methods import (
+    TARGET_WORK_TIME,
     get_admin_stats,
+    get_monthly_trends,
     get_quick_actions,
-    get_target_status,
-    get_user_stats,
+    get_user_dashboard,
     home_context,
     log_activity,
 )
 from avg_calc.models import (
     DailyWorkSummary,
     Leave,
+    MonthlyWorkRollup,
     RecentActivity,
     SalaryExpenses,
     Task,
+    TimelogImport,
     User,
     WorkTimeEntry,
 )
+from avg_calc.org_imports import import_org_time_logs
+from avg_calc.pagination import KeysetPaginator
+from avg_calc.payroll import (
+    add_working_days,
+    close_month,
+    get_payroll,
+    get_payroll_rules,
+    reopen_month,
+)
+from avg_calc.pdf_cache import (
+    cached_pdf,
+    store_pdf,
+    worklog_pdf_key,
+    worklog_range_pdf_key,
+)
+from avg_calc.reports import (
+    fetch_worklog_rows,
+    month_range,
+    render_worklog_pdf,
+    render_worklog_range_pdf,
+    stream_worklog_zip,
+    worklog_summary,
+)
 from avg_calc.templatetags.custom_filter import format_duration
-
-TARGET_WORK_TIME = timedelta(hours=8, minutes=40)
+from avg_calc.work_calendar import working_day_counts, working_days
 
 username = "test"
 password = "Lemon@123"
 
 
-def safe_localtime(time_obj, date_obj=None):
-    if time_obj is None:
-        return ""
-
-    # If only time is provided, combine with date (if available)
-    if isinstance(time_obj, time) and date_obj:
-        dt = datetime.combine(date_obj, time_obj)
-    elif isinstance(time_obj, datetime):
-        dt = time_obj
-    else:
-        return str(time_obj)
-
-    if is_naive(dt):
-        dt = make_aware(dt)
-
-    return localtime(dt).strftime("%H:%M")
-
-
 def home(request):
     """
     Renders the TimeLogix homepage with dynamic content.
@@ -195,7 +229,9 @@ def profile_view(request):
 @login_required
 def create_timelogs(request):
     if request.method == "POST":
-        form = WorkTimeEntryForm(request.POST)
+        form = WorkTimeEntryForm(
+            request.POST, instance=WorkTimeEntry(user=request.user)
+        )
         if form.is_valid():
             work_time_entry = form.save(commit=False)
             work_time_entry.user = request.user
@@ -210,9 +246,7 @@ def create_timelogs(request):
 
 @login_required
 def export_template(request):
-    df = pd.DataFrame(
-        columns=["Date", "Login Time", "Logout Time", "Break-Out Time", "Break-In Time"]
-    )
+    df = pd.DataFrame(columns=TIMELOG_COLUMNS)
     response = HttpResponse(
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
@@ -228,161 +262,183 @@ def upload_time_logs(request):
     if request.method == "POST":
         form = UploadExcelForm(request.POST or None, request.FILES or None)
         if form.is_valid():
-            excel_file = request.FILES["excel_file"]
-            data = pd.read_excel(excel_file)
-
-            data["Date"] = pd.to_datetime(data["Date"], format="%d-%m-%Y").dt.date
-            data["Login Time"] = pd.to_datetime(
-                data["Login Time"], format="%H:%M:%S"
-            ).dt.time
-            data["Logout Time"] = pd.to_datetime(
-                data["Logout Time"], format="%H:%M:%S"
-            ).dt.time
-            data["Break-Out Time"] = pd.to_datetime(
-                data["Break-Out Time"], format="%H:%M:%S"
-            ).dt.time
-            data["Break-In Time"] = pd.to_datetime(
-                data["Break-In Time"], format="%H:%M:%S"
-            ).dt.time
-
-            for _, row in data.iterrows():
-                WorkTimeEntry.objects.create(
-                    user=request.user,
-                    date=row["Date"],
-                    login_time=row["Login Time"],
-                    logout_time=row["Logout Time"],
-                    breakout_time=row["Break-Out Time"],
-                    breakin_time=row["Break-In Time"],
+            uploaded_file = request.FILES["excel_file"]
+            mode = form.cleaned_data["mode"] or "upsert"
+            background = getattr(settings, "TIMELOG_IMPORT_ASYNC", False)
+            if background or use_streaming(uploaded_file):
+                job = enqueue_import(request.user, uploaded_file, mode)
+                if not background and job.status == "queued":
+                    run_import_job(job)
+                return redirect(f"{reverse('import-timelogs')}?job={job.pk}")
+
+            result = import_time_logs(request.user, uploaded_file, mode=mode)
+            if mode == "dry_run":
+                messages.info(
+                    request,
+                    f"Dry run: {result.inserted} would be added, {result.updated} "
+                    f"would change, {result.unchanged} are identical.",
+                )
+                return redirect(f"{reverse('import-timelogs')}?job={result.job_id}")
+            messages.success(
+                request,
+                f"Timelogs uploaded successfully: {result.inserted} added, "
+                f"{result.updated} updated, {result.unchanged} unchanged "
+                f"({result.rows_per_second:.0f} rows/sec)!",
+            )
+            if result.failed:
+                messages.warning(
+                    request, f"{result.failed} rows were rejected, see the report."
                 )
-                log_activity(request.user, "Upload Work Time")
-            messages.success(request, "Timelogs uploaded successfully!")
+                return redirect(f"{reverse('import-timelogs')}?job={result.job_id}")
             return redirect("dashboard")
     else:
         form = UploadExcelForm()
 
-    return render(request, "worktime/upload_time_logs.html", {"form": form})
-
+    job = None
+    if request.GET.get("job"):
+        job = get_object_or_404(
+            with_report_previews(TimelogImport.objects.all()),
+            pk=request.GET["job"],
+            user=request.user,
+        )
 
-@login_required
-def dashboard(request):
-    today = datetime.now().date()
-    month_form = MonthChoiceForm(request.GET or None)
-    selected_month = int(month_form.data.get("month", today.month))
-    selected_year = int(month_form.data.get("year", today.year))
+    return render(request, "worktime/upload_time_logs.html", {"form": form, "job": job})
 
-    start_of_month = datetime(selected_year, selected_month, 1).date()
-    end_of_month = start_of_month.replace(
-        month=(selected_month % 12) + 1 if selected_month < 12 else 1,
-        year=selected_year + 1 if selected_month == 12 else selected_year,
-        day=1,
-    ) - timedelta(days=1)
 
-    # Get leaves
-    leaves = Leave.objects.filter(
-        user=request.user,
-        start_date__lte=end_of_month,
-        end_date__gte=start_of_month,
-    )
+@staff_member_required
+def upload_org_time_logs(request):
+    if request.method == "POST":
+        form = OrgUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            result, unknown_users = import_org_time_logs(
+                request.user,
+                request.FILES["upload_file"],
+                mode=form.cleaned_data["mode"] or "upsert",
+            )
+            if unknown_users:
+                messages.warning(
+                    request, f"Skipped unknown users: {', '.join(unknown_users)}"
+                )
+            if form.cleaned_data["mode"] == "dry_run":
+                messages.info(
+                    request,
+                    f"Dry run: {result.inserted} would be added, {result.updated} "
+                    f"would change, {result.unchanged} are identical.",
+                )
+                return redirect(f"{reverse('import-timelogs')}?job={result.job_id}")
+            messages.success(
+                request,
+                f"Timelogs uploaded successfully: {result.inserted} added, "
+                f"{result.updated} updated, {result.unchanged} unchanged "
+                f"({result.rows_per_second:.0f} rows/sec)!",
+            )
+            if result.failed:
+                messages.warning(
+                    request, f"{result.failed} rows were rejected, see the report."
+                )
+                return redirect(f"{reverse('import-timelogs')}?job={result.job_id}")
+            return redirect("import-org-timelogs")
+    else:
+        form = OrgUploadForm()
 
-    leave_days = set()
-    for leave in leaves:
-        leave_days.update(
-            [
-                leave.start_date + timedelta(days=i)
-                for i in range((leave.end_date - leave.start_date).days + 1)
-            ]
-        )
+    return render(request, "worktime/upload_org_time_logs.html", {"form": form})
 
-    # Generate all days in month
-    days_count = (end_of_month - start_of_month).days + 1
-    all_days = [start_of_month + timedelta(days=i) for i in range(days_count)]
-
-    # Identify excluded Saturdays
-    saturdays = [day for day in all_days if day.weekday() == 5]
-    excluded_saturdays = set()
-    if len(saturdays) >= 1:
-        excluded_saturdays.add(saturdays[0])  # 1st Saturday
-    if len(saturdays) >= 3:
-        excluded_saturdays.add(saturdays[2])  # 3rd Saturday
-
-    # Final working days
-    final_days = [
-        day
-        for day in all_days
-        if day.weekday() != 6
-        and day not in excluded_saturdays
-        and day not in leave_days
-    ]
 
-    entries = WorkTimeEntry.objects.filter(
-        user=request.user, date__range=[start_of_month, end_of_month]
-    ).exclude(date__in=leave_days)
+@login_required
+def import_status(request, pk):
+    """
+    Returns the progress of an import job as JSON for the upload page to poll.
+    """
+    jobs = with_report_previews(TimelogImport.objects.all())
+    if request.user.is_staff:
+        job = get_object_or_404(jobs, pk=pk)
+    else:
+        job = get_object_or_404(jobs, pk=pk, user=request.user)
 
-    total_work_seconds = sum(
-        entry.total_work_time.total_seconds()
-        for entry in entries
-        if entry.total_work_time
+    return JsonResponse(
+        {
+            "id": job.pk,
+            "file_name": job.file_name,
+            "status": job.status,
+            "rows_total": job.rows_total,
+            "rows_committed": job.rows_committed,
+            "rows_imported": job.rows_imported,
+            "rows_updated": job.rows_updated,
+            "rows_unchanged": job.rows_unchanged,
+            "rows_failed": job.rows_failed,
+            "errors": job.errors_preview,
+            "dry_run": job.mode == "dry_run",
+            "changes": job.changes_preview,
+            "finished": job.status in ("done", "failed"),
+        }
     )
 
-    working_days_count = len(final_days)
-    average_work_seconds = (
-        total_work_seconds / working_days_count if working_days_count else 0
-    )
 
-    # Assuming TARGET_WORK_TIME is defined in settings or as a constant
-    TARGET_WORK_TIME = timedelta(hours=8, minutes=40)
-
-    additional_seconds_per_day = 0
-    need_time = 0
-    overtime = 0
-    if (
-        working_days_count > 0
-        and average_work_seconds < TARGET_WORK_TIME.total_seconds()
-    ):
-        total_target_seconds = TARGET_WORK_TIME.total_seconds() * working_days_count
-        time_difference_seconds = total_target_seconds - total_work_seconds
-        additional_seconds_per_day = time_difference_seconds / days_count
-        need_time = additional_seconds_per_day / 60
-    elif working_days_count > 0:
-        total_target_seconds = TARGET_WORK_TIME.total_seconds() * working_days_count
-        additional_overtime = total_work_seconds - total_target_seconds
-        overtime = (additional_overtime / days_count) / 60
-
-    average_time = total_work_seconds / len(entries) if entries else 0
-
-    # Dynamic stat cards for user dashboard
-    user_stats = get_user_stats(entries, total_work_seconds, need_time, average_time)
-
-    # Dynamic target status
-    target_status = get_target_status(
-        average_time, TARGET_WORK_TIME.total_seconds(), need_time
-    )
+@login_required
+def export_import_errors(request, pk):
+    """
+    Downloads the rejected rows of an import as CSV or XLSX (``?format=xlsx``).
+    """
+    if request.user.is_staff:
+        job = get_object_or_404(TimelogImport, pk=pk)
+    else:
+        job = get_object_or_404(TimelogImport, pk=pk, user=request.user)
+
+    columns = ["row", "error", "Source", USERNAME_COLUMN, *TIMELOG_COLUMNS]
+    report = pd.DataFrame(job.errors)
+    report = report.reindex(
+        columns=[column for column in columns if column in report.columns]
+    ).rename(columns={"row": "Row", "error": "Error"})
+    filename = f"import_{job.pk}_errors"
+
+    if request.GET.get("format") == "xlsx":
+        response = HttpResponse(
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}.xlsx"'
+        with pd.ExcelWriter(response, engine="openpyxl") as writer:
+            report.to_excel(writer, index=False, sheet_name="Errors")
+        return response
+
+    response = HttpResponse(content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    report.to_csv(response, index=False)
+    return response
 
-    # Admin dashboard stats
-    total_users = User.objects.count()
-    total_worklogs = WorkTimeEntry.objects.count()
-    total_expenses = SalaryExpenses.objects.aggregate(total=Sum("salary"))["total"] or 0
-    total_tasks = Task.objects.count()
-    total_leaves = Leave.objects.count()
 
-    admin_stats = get_admin_stats(
-        total_users, total_worklogs, total_expenses, total_tasks, total_leaves
-    )
+@login_required
+def dashboard(request):
+    today = datetime.now().date()
+    month_form = MonthChoiceForm(request.GET or None)
+    selected_month = int(month_form.data.get("month", today.month))
+    selected_year = int(month_form.data.get("year", today.year))
+
+    cache_key = dashboard_cache_key(request.user.pk, selected_year, selected_month)
+    user_dashboard = cache.get(cache_key)
+    cache_status = "hit"
+    if user_dashboard is None:
+        cache_status = "miss"
+        user_dashboard = get_user_dashboard(request.user, selected_year, selected_month)
+        cache.set(cache_key, user_dashboard, get_dashboard_cache_timeout())
 
     # Quick actions (already in view, reused)
     quick_actions = get_quick_actions()
 
-    # Top 3 active users (based on recent activity count)
-    top_3_active_users = (
-        User.objects.annotate(activity_count=Count("recentactivity"))
-        .order_by("-activity_count")[:3]
-        .values(
-            "username",
-            activity_description=Value(
-                "Most active this week", output_field=CharField()
-            ),
+    # Organization-wide stats are only shown to staff
+    admin_stats, top_3_recent_activity, top_3_active_users = [], [], []
+    if request.user.is_staff:
+        counters = get_counters()
+        admin_stats = get_admin_stats(
+            counters["users"],
+            counters["worklogs"],
+            counters["expenses"],
+            counters["tasks"],
+            counters["leaves"],
         )
-    )
+        top_3_recent_activity = RecentActivity.objects.order_by("-timestamp")[:3]
+
+        # Top 3 active users over the activity window
+        top_3_active_users = top_active_users(limit=3)
 
     context = {
         "dashboard_title": "My Dashboard" if not request.user.is_staff else "Dashboard",
@@ -392,15 +448,119 @@ def dashboard(request):
             else "Overview of your organization's time tracking metrics."
         ),
         "month_form": month_form,
-        "user_stats": user_stats,
+        **user_dashboard,
         "quick_actions": quick_actions,
-        "target_status": target_status,
         "admin_stats": admin_stats,
-        "top_3_recent_activity": RecentActivity.objects.order_by("-timestamp")[:3],
+        "top_3_recent_activity": top_3_recent_activity,
         "top_3_active_users": top_3_active_users,
     }
 
-    return render(request, "worktime/dashboard.html", context)
+    response = render(request, "worktime/dashboard.html", context)
+    response["X-Dashboard-Cache"] = cache_status
+    return response
+
+
+def get_trend_range(request):
+    """
+    Reads the trend period from ``?year=YYYY``, clamped to the years ``date``
+    supports, or ``?months=N`` (the last N months up to the current one, 12 by
+    default and at most 60).
+
+    Returns:
+        tuple: The first and last ``(year, month)`` of the period.
+    """
+    today = datetime.now().date()
+    year = request.GET.get("year", "")
+    if year.isdigit():
+        year = min(max(int(year), MINYEAR), MAXYEAR)
+        return (year, 1), (year, 12)
+
+    months = request.GET.get("months", "")
+    months = min(int(months), 60) if months.isdigit() and int(months) else 12
+    first_period = today.year * 12 + today.month - months
+    return (first_period // 12, first_period % 12 + 1), (today.year, today.month)
+
+
+def get_report_month(request, today):
+    """
+    Reads the report month from ``?month=&year=``. Values that are not numbers
+    fall back to the current month and year, the rest are clamped to a month
+    of the years ``date`` supports.
+
+    Returns:
+        tuple: The ``(year, month)`` to report.
+    """
+    month = request.GET.get("month", "")
+    year = request.GET.get("year", "")
+    month = min(max(int(month), 1), 12) if month.isdigit() else today.month
+    year = min(max(int(year), MINYEAR), MAXYEAR) if year.isdigit() else today.year
+    return year, month
+
+
+def get_trend_user(request):
+    """
+    Staff see the whole organization unless ``?user=<id>`` picks one user;
+    everyone else only sees their own trend.
+    """
+    if not request.user.is_staff:
+        return request.user
+    user_id = request.GET.get("user", "")
+    return get_object_or_404(User, pk=user_id) if user_id.isdigit() else None
+
+
+@login_required
+def trends(request):
+    first, last = get_trend_range(request)
+    trend_user = get_trend_user(request)
+    months = get_monthly_trends(
+        first, last, user_id=trend_user.pk if trend_user else None
+    )
+    longest = max((month["total_seconds"] for month in months), default=0)
+    for month in months:
+        month["label"] = date(month["year"], month["month"], 1).strftime("%b %Y")
+        month["percent"] = month["total_seconds"] * 100 / longest if longest else 0
+        gap = month["target_gap_seconds"]
+        month["gap_label"] = (
+            f"{'-' if gap < 0 else '+'}{format_duration(abs(gap))}"
+            if month["entry_count"]
+            else "-"
+        )
+
+    return render(
+        request,
+        "worktime/trends.html",
+        {
+            "months": months,
+            "trend_user": trend_user,
+            "users": (
+                User.objects.order_by("username").values("id", "username")
+                if request.user.is_staff
+                else []
+            ),
+            "month_options": ["6", "12", "24", "36"],
+            "selected_months": request.GET.get("months", ""),
+            "selected_year": request.GET.get("year", ""),
+            "years": range(2020, datetime.now().year + 1),
+        },
+    )
+
+
+@login_required
+def trends_data(request):
+    """
+    Returns the monthly totals of the trends page as JSON.
+    """
+    first, last = get_trend_range(request)
+    trend_user = get_trend_user(request)
+    return JsonResponse(
+        {
+            "user": trend_user.username if trend_user else None,
+            "target_seconds": TARGET_WORK_TIME.total_seconds(),
+            "months": get_monthly_trends(
+                first, last, user_id=trend_user.pk if trend_user else None
+            ),
+        }
+    )
 
 
 @login_required
@@ -430,92 +590,86 @@ def total_expenses(request):
         "entries": [],
         "salary": 0,
         "pf": 0,
+        "lunch_per_day": get_payroll_rules()["lunch_per_day"],
         "total_lunch_expenses": 0,
         "balance": 0,
+        "payroll": None,
         "no_data": False,
     }
 
+    target_user = request.user
     if request.user.is_staff:
         selected_user_id = (
             month_form.data.get("user") if month_form.is_valid() else None
         )
-        if selected_user_id:
-            try:
-                target_user = User.objects.get(id=selected_user_id)
-                profile = SalaryExpenses.objects.filter(user=target_user).first()
-                if profile:
-                    entries = WorkTimeEntry.objects.filter(
-                        user=target_user, date__range=[start_of_month, end_of_month]
-                    )
-                    total_lunch_expenses = entries.count() * 50
-                    pf = 200
-                    payment = profile.salary - pf
-                    balance = payment - total_lunch_expenses
-                    context.update(
-                        {
-                            "entries": entries,
-                            "salary": payment,
-                            "pf": pf,
-                            "total_lunch_expenses": total_lunch_expenses,
-                            "balance": balance,
-                        }
-                    )
-                else:
-                    context["no_data"] = True
-            except User.DoesNotExist:
-                context["no_data"] = True
-        else:
-            profiles = SalaryExpenses.objects.filter(user__is_superuser=False)
-            if profiles.exists():
-                entries = WorkTimeEntry.objects.filter(
-                    date__range=[start_of_month, end_of_month], user__is_superuser=False
-                )
-                total_lunch_expenses = entries.count() * 50
-                total_salary = sum(profile.salary for profile in profiles)
-                total_pf = profiles.count() * 200
-                total_payment = total_salary - total_pf
-                balance = total_payment - total_lunch_expenses
-                context.update(
-                    {
-                        "entries": entries,
-                        "salary": total_payment,
-                        "pf": total_pf,
-                        "total_lunch_expenses": total_lunch_expenses,
-                        "balance": balance,
-                    }
-                )
-            else:
-                context["no_data"] = True
-    else:
-        profile = SalaryExpenses.objects.filter(user=request.user).first()
-        if profile:
-            entries = WorkTimeEntry.objects.filter(
-                user=request.user, date__range=[start_of_month, end_of_month]
-            )
-            total_lunch_expenses = entries.count() * 50
-            pf = 200
-            payment = profile.salary - pf
-            balance = payment - total_lunch_expenses
-            context.update(
-                {
-                    "entries": entries,
-                    "salary": payment,
-                    "pf": pf,
-                    "total_lunch_expenses": total_lunch_expenses,
-                    "balance": balance,
-                }
+        target_user = (
+            User.objects.filter(id=selected_user_id).first()
+            if selected_user_id
+            else None
+        )
+        if selected_user_id and target_user is None:
+            context["no_data"] = True
+            return render(request, "worktime/total_expenses.html", context)
+
+    period, rows, totals = get_payroll(selected_year, selected_month, target_user)
+    context["period"] = period
+    if period:
+        context["lunch_per_day"] = period.lunch_per_day
+    if totals["headcount"]:
+        context.update(
+            {
+                "salary": totals["total_payment"],
+                "pf": totals["total_pf"],
+                "total_lunch_expenses": totals["total_lunch"],
+                "balance": totals["total_balance"],
+            }
+        )
+        if target_user:
+            paginator = KeysetPaginator(
+                WorkTimeEntry.objects.filter(
+                    user=target_user, date__range=[start_of_month, end_of_month]
+                ),
+                ("date", "id"),
             )
         else:
-            context["no_data"] = True
-
-    # Paginate entries
-    paginator = Paginator(context["entries"], 10)
-    page_number = request.GET.get("page")
-    context["entries"] = paginator.get_page(page_number)
+            # Organization view: one payroll row per user instead of timelogs
+            paginator = KeysetPaginator(rows, ("username", "user_id"))
+            context["payroll"] = True
+        context["entries"] = paginator.get_page(request.GET)
+        if context["payroll"]:
+            context["entries"].object_list = add_working_days(
+                context["entries"], selected_year, selected_month
+            )
+    else:
+        context["no_data"] = True
 
     return render(request, "worktime/total_expenses.html", context)
 
 
+@staff_member_required
+@require_POST
+def update_payroll_period(request):
+    month_form = MonthChoiceForm(request.POST)
+    if not month_form.is_valid() or not month_form.cleaned_data["year"]:
+        messages.error(request, "Select a month and year to close or reopen.")
+        return redirect("expenses")
+
+    year = int(month_form.cleaned_data["year"])
+    month = int(month_form.cleaned_data["month"])
+    label = date(year, month, 1).strftime("%B %Y")
+    if request.POST.get("action") == "reopen":
+        if reopen_month(year, month):
+            messages.success(request, f"Payroll for {label} reopened.")
+        else:
+            messages.error(request, f"Payroll for {label} is not closed.")
+    elif close_month(year, month, closed_by=request.user):
+        log_activity(request.user, f"Closed payroll for {label}")
+        messages.success(request, f"Payroll for {label} closed.")
+    else:
+        messages.error(request, f"Payroll for {label} is already closed.")
+    return redirect(f"{reverse('expenses')}?month={month}&year={year}")
+
+
 @login_required
 def update_salary_expenses(request):
     user = request.user
@@ -663,11 +817,14 @@ def task_list(request):
 
 @login_required()
 def recent_activity(request):
-    activities = RecentActivity.objects.filter(user=request.user).order_by("-timestamp")
+    activities = RecentActivity.objects.filter(user=request.user)
 
-    paginator = Paginator(activities, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(
+        activities,
+        ("-timestamp", "-id"),
+        count_key=f"avg_calc:activity_count:{request.user.pk}",
+    )
+    page_obj = paginator.get_page(request.GET)
 
     context = {
         "page_obj": page_obj,
@@ -694,27 +851,6 @@ def work_view(request):
         month=selected_month % 12 + 1, day=1
     ) - timedelta(days=1)
 
-    # Get leave days for the relevant user
-    if request.user.is_staff:
-        selected_user_id = (
-            month_form.data.get("user") if month_form.is_valid() else None
-        )
-        target_user = (
-            User.objects.get(id=selected_user_id) if selected_user_id else request.user
-        )
-    else:
-        target_user = request.user
-
-    leaves = Leave.objects.filter(
-        user=target_user, start_date__lte=end_of_month, end_date__gte=start_of_month
-    )
-    leave_days = set()
-    for leave in leaves:
-        leave_days.update(
-            leave.start_date + timedelta(days=i)
-            for i in range((leave.end_date - leave.start_date).days + 1)
-        )
-
     # Filter work time entries
     if request.user.is_staff:
         selected_user_id = (
@@ -726,14 +862,14 @@ def work_view(request):
                 WorkTimeEntry.objects.filter(
                     user_id=selected_user_id, date__range=[start_of_month, end_of_month]
                 )
-                .exclude(date__in=leave_days)
+                .exclude(on_leave())
                 .order_by("date")
             )
         else:
             # Show all users' entries
             all_entries = (
                 WorkTimeEntry.objects.filter(date__range=[start_of_month, end_of_month])
-                .exclude(date__in=leave_days)
+                .exclude(on_leave())
                 .order_by("date")
             )
     else:
@@ -742,19 +878,33 @@ def work_view(request):
             WorkTimeEntry.objects.filter(
                 user=request.user, date__range=[start_of_month, end_of_month]
             )
-            .exclude(date__in=leave_days)
+            .exclude(on_leave())
             .order_by("date")
         )
 
     # Paginate entries
-    paginator = Paginator(all_entries, 10)
-    page_number = request.GET.get("page")
-    entries = paginator.get_page(page_number)
+    entries = KeysetPaginator(all_entries, ("date", "id")).get_page(request.GET)
+
+    # Working days of the listed user, or of the company for everyone
+    if not request.user.is_staff:
+        selected_user_id = request.user.pk
+    if selected_user_id:
+        working_days_count = working_day_counts(
+            [int(selected_user_id)], start_of_month, end_of_month
+        )[int(selected_user_id)]
+    else:
+        working_days_count = len(working_days(start_of_month, end_of_month))
 
     return render(
         request,
         "worktime/work-list.html",
-        {"entries": entries, "month_form": month_form},
+        {
+            "entries": entries,
+            "month_form": month_form,
+            "start_of_month": start_of_month,
+            "end_of_month": end_of_month,
+            "working_days": working_days_count,
+        },
     )
 
 
@@ -843,10 +993,9 @@ def leaves(request):
 
 @login_required
 def users(request):
-    users = User.objects.all().order_by("id")
-    paginator = Paginator(users, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    users = User.objects.all()
+    paginator = KeysetPaginator(users, ("id",), count_key="avg_calc:user_count")
+    page_obj = paginator.get_page(request.GET)
 
     context = {
         "users": users,
@@ -882,11 +1031,75 @@ def delete_user(request, user_id):
     return render(request, "worktime/users.html", {"user_obj": user_obj})
 
 
+@login_required
+def export_timelogs(request):
+    """
+    Streams the timelogs of a date range as CSV or XLSX (``?format=xlsx``).
+    Staff export everyone unless ``?user=`` picks one user.
+    """
+    form = TimelogExportForm(request.GET)
+    if not form.is_valid():
+        messages.error(request, "Invalid export filters.")
+        return redirect("worktime")
+
+    start_date = form.cleaned_data["start_date"]
+    end_date = form.cleaned_data["end_date"]
+    if request.user.is_staff:
+        user_id = form.cleaned_data["user"]
+        user = get_object_or_404(User, id=user_id) if user_id else None
+    else:
+        user = request.user
+
+    entries = export_queryset(start_date, end_date, user)
+    filename = f"timelogs_{user.username if user else 'all'}_{start_date}_{end_date}"
+
+    if form.cleaned_data["format"] == "xlsx":
+        return FileResponse(
+            write_xlsx(entries),
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type=XLSX_CONTENT_TYPE,
+        )
+
+    response = StreamingHttpResponse(stream_csv(entries), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def cached_pdf_response(request, key, filename, render):
+    """
+    Answers a PDF download from the disk cache, rendering with ``render`` only
+    on a miss. ``key`` doubles as the ``ETag``, so a repeat download with a
+    matching ``If-None-Match`` gets a 304.
+    """
+    etag = quote_etag(key)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        path = cached_pdf(key)
+        if path is None:
+            content = render()
+            if content is None:
+                return HttpResponse("Error creating PDF", status=500)
+            path = store_pdf(key, content)
+        response = FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=filename,
+            content_type="application/pdf",
+        )
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @login_required
 def export_worklog(request):
+    """
+    Downloads a worklog PDF for one month (``?month=&year=``) or for any date
+    range (``?start_date=&end_date=``) with a subtotal per month.
+    """
     today = datetime.now().date()
-    selected_month = int(request.GET.get("month", today.month))
-    selected_year = today.year
     user_id = request.GET.get("user")
 
     if request.user.is_staff and user_id:
@@ -894,87 +1107,73 @@ def export_worklog(request):
     else:
         user = request.user
 
-    start_of_month = datetime(selected_year, selected_month, 1).date()
-    if selected_month == 12:
-        end_of_month = datetime(selected_year + 1, 1, 1).date() - timedelta(days=1)
+    if "start_date" in request.GET or "end_date" in request.GET:
+        form = TimelogExportForm(request.GET)
+        if not form.is_valid():
+            messages.error(request, "Invalid report dates.")
+            return redirect("worktime")
+        start_date = form.cleaned_data["start_date"]
+        end_date = form.cleaned_data["end_date"]
+        selected_year, selected_month = start_date.year, start_date.month
+        if (start_date, end_date) != month_range(selected_year, selected_month):
+            return cached_pdf_response(
+                request,
+                worklog_range_pdf_key(user, start_date, end_date),
+                f"timelog_{start_date}_{end_date}.pdf",
+                lambda: render_worklog_range_pdf(user, start_date, end_date),
+            )
     else:
-        end_of_month = datetime(
-            selected_year, selected_month + 1, 1
-        ).date() - timedelta(days=1)
-
-    work_logs = WorkTimeEntry.objects.filter(
-        user=user, date__range=[start_of_month, end_of_month]
-    ).order_by("date")
-
-    data = []
-    total_work_time = timedelta()
-    total_lunch_time = timedelta()
-    half_days = 0
-
-    for log in work_logs:
-        login = safe_localtime(log.login_time)
-        logout = safe_localtime(log.logout_time)
-        breakout = safe_localtime(log.breakout_time)
-        breakin = safe_localtime(log.breakin_time)
-
-        total_work = log.total_work_time
-
-        if log.breakout_time and log.breakin_time:
-            break_start = datetime.combine(log.date, log.breakout_time)
-            break_end = datetime.combine(log.date, log.breakin_time)
-            lunch_duration = break_end - break_start
-        else:
-            lunch_duration = timedelta()
-
-        if total_work:
-            total_work_time += total_work
-            if total_work < timedelta(hours=6, minutes=30):
-                half_days += 1
+        selected_year, selected_month = get_report_month(request, today)
 
-        total_lunch_time += lunch_duration
+    rollup = (
+        MonthlyWorkRollup.objects.filter(
+            user=user, year=selected_year, month=selected_month
+        ).first()
+        or MonthlyWorkRollup()
+    )
 
-        data.append(
-            {
-                "Date": log.date.strftime("%Y-%m-%d"),
-                "Login": login,
-                "Logout": logout,
-                "Break-Out": breakout,
-                "Break-In": breakin,
-                "Total-Work-Time": str(total_work or ""),
-            }
+    def render():
+        rows = fetch_worklog_rows([user], *month_range(selected_year, selected_month))
+        return render_worklog_pdf(
+            user,
+            selected_year,
+            selected_month,
+            rows.get(user.pk, []),
+            worklog_summary(rollup),
         )
 
-    df = pd.DataFrame(data)
-    present_days = len(df)
-    average_work_time = (
-        total_work_time / present_days if present_days > 0 else timedelta()
+    # Same user, month, rows and template render the same PDF
+    return cached_pdf_response(
+        request,
+        worklog_pdf_key(user, selected_year, selected_month, rollup),
+        f"timelog_{selected_month}_{selected_year}.pdf",
+        render,
     )
 
-    # Convert df to HTML table
-    table_html = df.to_html(index=False, classes="styled-table", border=1)
 
-    template = get_template("worktime/worklog_pdf.html")
-    html = template.render(
-        {
-            "user": user,
-            "month": start_of_month.strftime("%B"),
-            "year": selected_year,
-            "table_html": table_html,
-            "present_days": present_days,
-            "total_work_time": total_work_time,
-            "total_lunch_time": total_lunch_time,
-            "average_work_time": average_work_time,
-            "half_days": half_days,
-        }
+@staff_member_required
+def export_worklogs_zip(request):
+    """
+    Streams every user's monthly worklog PDF in one zip, rendered in parallel.
+    """
+    month_form = MonthChoiceForm(request.GET or None)
+    today = datetime.now().date()
+    selected_month, selected_year = today.month, today.year
+    if month_form.is_valid():
+        selected_month = int(month_form.cleaned_data["month"])
+        selected_year = int(month_form.cleaned_data["year"] or today.year)
+
+    users = User.objects.filter(is_superuser=False).order_by("username")
+    if month_form.is_valid() and month_form.cleaned_data["user"]:
+        users = users.filter(id=month_form.cleaned_data["user"])
+
+    response = StreamingHttpResponse(
+        stream_worklog_zip(users, selected_year, selected_month),
+        content_type="application/zip",
     )
-
-    response = HttpResponse(content_type="application/pdf")
     response["Content-Disposition"] = (
-        f'attachment; filename="timelog_{selected_month}_{selected_year}.pdf"'
+        f'attachment; filename="timelogs_{selected_month}_{selected_year}.zip"'
     )
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    if pisa_status.err:
-        return HttpResponse("Error creating PDF", status=500)
     return response
 
 
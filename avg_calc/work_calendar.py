@@ -0,0 +1,125 @@
+from calendar import monthrange
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from avg_calc.leave_index import LeaveIndex
+from avg_calc.models import Holiday
+from avg_calc.versions import bump_versions, get_versions
+
+CALENDAR_VERSION_KEY = "work_calendar"
+
+
+def get_weekmask():
+    return getattr(settings, "WORK_WEEKMASK", "1111110")
+
+
+def get_off_saturdays():
+    return tuple(getattr(settings, "WORK_OFF_SATURDAYS", (1, 3)))
+
+
+def month_bounds(year, month):
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def iter_months(start_date, end_date):
+    """
+    Yields the ``(year, month)`` pairs touched by a date range, inclusive.
+    """
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def calendar_version():
+    return get_versions([CALENDAR_VERSION_KEY])[CALENDAR_VERSION_KEY]
+
+
+def bump_calendar():
+    """
+    Makes every process rebuild its month calendars on their next use. The
+    bump commits with the current transaction.
+    """
+    bump_versions([CALENDAR_VERSION_KEY])
+
+
+def month_calendar(year, month, version=None):
+    """
+    Builds the working-day bitmap of one month.
+
+    A day works when ``WORK_WEEKMASK`` says so, it is not one of the
+    ``WORK_OFF_SATURDAYS`` (1st and 3rd by default) and it is not a company
+    ``Holiday``. Results are memoized per process under the shared calendar
+    version, which saving or deleting a holiday bumps. Pass ``version`` to
+    skip reading it again when building many months.
+
+    Returns:
+        tuple: The month's days as ``datetime64[D]`` and their working bitmap.
+    """
+    if version is None:
+        version = calendar_version()
+    return _month_calendar(year, month, version)
+
+
+@lru_cache(maxsize=getattr(settings, "WORK_CALENDAR_CACHE_SIZE", 240))
+def _month_calendar(year, month, version):
+    # ``version`` only keys the cache; a new version rebuilds every month.
+    first, last = month_bounds(year, month)
+    days = np.arange(first, last + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    holidays = list(
+        Holiday.objects.filter(date__range=(first, last)).values_list("date", flat=True)
+    )
+    working = np.is_busday(days, weekmask=get_weekmask(), holidays=holidays)
+
+    saturdays = np.flatnonzero(np.is_busday(days, weekmask="0000010"))
+    off = [nth - 1 for nth in get_off_saturdays() if nth <= len(saturdays)]
+    working[saturdays[off]] = False
+
+    days.flags.writeable = working.flags.writeable = False
+    return days, working
+
+
+def working_days(start_date, end_date):
+    """
+    Returns the company working days between two dates, inclusive, as a
+    sorted ``datetime64[D]`` array.
+    """
+    months, version = [], calendar_version()
+    for year, month in iter_months(start_date, end_date):
+        days, working = month_calendar(year, month, version)
+        months.append(days[working])
+
+    days = np.concatenate(months) if months else np.array([], dtype="datetime64[D]")
+    return days[(days >= np.datetime64(start_date)) & (days <= np.datetime64(end_date))]
+
+
+def user_working_days(user, start_date, end_date, leaves=None):
+    """
+    Returns the days in the range that are working days for the company and
+    not covered by one of the user's leaves. Pass a prebuilt ``LeaveIndex`` to
+    check many users without querying leaves again.
+    """
+    if leaves is None:
+        leaves = LeaveIndex.for_range(start_date, end_date, users=[user])
+    days = working_days(start_date, end_date)
+    return days[~leaves.contains(user.pk, days)]
+
+
+def working_day_counts(user_ids, start_date, end_date, leaves=None):
+    """
+    Counts the working days left to each user after their leaves, checking
+    every (user, day) pair in one vectorized lookup.
+
+    Returns:
+        dict: Working-day counts keyed by user id.
+    """
+    user_ids = np.asarray(list(user_ids), dtype=np.int64)
+    if leaves is None:
+        leaves = LeaveIndex.for_range(start_date, end_date, users=user_ids.tolist())
+    days = working_days(start_date, end_date)
+    on_leave = leaves.contains(user_ids[:, None], days[None, :])
+    counts = len(days) - on_leave.sum(axis=1)
+    return dict(zip(user_ids.tolist(), counts.tolist()))
@@ -131,7 +131,48 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
 
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Timelog imports
+
+TIMELOG_IMPORT_BATCH_SIZE = 1000  # Rows per upsert statement (at most 9362)
+TIMELOG_IMPORT_CHUNK_SIZE = 5000  # Rows parsed and committed together when streaming
+TIMELOG_STREAMING_THRESHOLD = 5 * 1024 * 1024  # Uploads larger than this are streamed
+TIMELOG_IMPORT_ASYNC = False  # True queues uploads; needs `manage.py run_import_worker`
+TIMELOG_IMPORT_ERROR_LIMIT = 1000  # Rejected rows kept for an import's error report
+TIMELOG_IMPORT_STALE_AFTER = 900  # Seconds without progress before a job is requeued
+TIMELOG_IMPORT_WORKERS = None  # Parser processes for organization imports (None = CPUs)
+TIMELOG_IMPORT_PART_BYTES = 4 * 1024 * 1024  # Smallest CSV range parsed per worker
+WORKER_START_METHOD = "spawn"  # How import and PDF worker processes are started
+TIMELOG_EXPORT_CHUNK_SIZE = 2000  # Rows fetched per round trip when exporting
+
+# Working calendar
+WORK_WEEKMASK = "1111110"  # Monday..Sunday, 1 = working day
+WORK_OFF_SATURDAYS = (1, 3)  # Saturdays of the month that are days off
+WORK_CALENDAR_CACHE_SIZE = 240  # Month calendars kept in memory per process
+
+# Dashboard activity
+ACTIVE_USERS_WINDOW_DAYS = 7  # Rolling window for "most active users"
+ORG_COUNTER_SHARDS = 16  # Delta rows per counter; `reconcile_counters` folds them
+DASHBOARD_CACHE_TIMEOUT = 3600  # Seconds a rendered month of a user's dashboard is kept
+
+# Payroll
+PAYROLL_PF_DEDUCTION = "200.00"  # Flat monthly provident fund deduction
+PAYROLL_LUNCH_PER_DAY = "50.00"  # Lunch deduction per day with a timelog
+
+# Pagination
+PAGINATION_COUNT_CACHE_TIMEOUT = 60  # Seconds list totals stay cached
+
+# Worklog PDFs
+WORKLOG_PDF_ENGINE = "xhtml2pdf"  # "xhtml2pdf" (HTML template) or "reportlab"
+WORKLOG_PDF_CACHE_DIR = os.path.join(BASE_DIR, "cache", "worklog_pdfs")
+WORKLOG_PDF_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Evict least recently used past this
+WORKLOG_PDF_CHUNK_ROWS = 500  # Rows rendered per chunk of a date-range report
+WORKLOG_PDF_WORKERS = None  # Processes rendering bulk PDF exports (None = CPUs)